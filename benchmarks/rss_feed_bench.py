@@ -0,0 +1,377 @@
+"""
+Measure how the RSS cog's feed loop scales with the amount of feeds.
+
+Starts a local aiohttp server that serves synthetic RSS/Atom feeds with configurable
+sizes, latencies and error rates, then runs feed cycles of the RSS cog against it with
+a fake bot, fake channels and an in-memory stand-in for Config. For each feed count
+it reports feeds per second, event loop lag, peak memory and Config writes.
+
+The first cycle sees every feed for the first time. Before the second cycle a part of
+the feeds get new posts (see --update-rate) and every url is made due again, which
+shows the steady state with conditional GETs and entry fingerprints in use.
+
+Run from the repository root, in an environment with the RSS cog's requirements installed:
+
+    python benchmarks/rss_feed_bench.py --feeds 100 1000 10000
+
+Feeds are spread over --hosts loopback addresses (127.0.x.y) so the per-host limit
+behaves like it would with real sites, which needs the whole 127.0.0.0/8 range to
+be routed to loopback like it is on Linux. Use --hosts 1 elsewhere.
+"""
+
+import argparse
+import asyncio
+import copy
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rss.rss as rss_module  # noqa: E402
+
+RSS_ENTRY = """<item><title>Post {index} of feed {feed}</title><link>https://example.com/{feed}/{index}</link>
+<guid>https://example.com/{feed}/{index}</guid><pubDate>{date}</pubDate>
+<description><![CDATA[<p>Post {index} with a <a href="https://example.com">link</a>.</p>{body}]]></description></item>"""
+ATOM_ENTRY = """<entry><title>Post {index} of feed {feed}</title><link href="https://example.com/{feed}/{index}"/>
+<id>https://example.com/{feed}/{index}</id><updated>{iso_date}</updated>
+<content type="html"><![CDATA[<p>Post {index} with a <a href="https://example.com">link</a>.</p>{body}]]></content></entry>"""
+
+
+class FakeFeedServer:
+    """Serves /feed/<id> as a synthetic feed whose newest post is `self.versions[id]`."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.versions = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.runner = None
+
+    def render(self, feed_id: int, version: int, atom: bool) -> bytes:
+        body = "<p>filler text</p>" * self.args.paragraphs
+        base_time = 1_600_000_000
+        entries = []
+        for index in range(version, max(version - self.args.entries, 0), -1):
+            timestamp = base_time + index * 3600
+            date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(timestamp))
+            iso_date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+            template = ATOM_ENTRY if atom else RSS_ENTRY
+            entries.append(
+                template.format(index=index, feed=feed_id, date=date, iso_date=iso_date, body=body)
+            )
+        if atom:
+            feed = (
+                '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f"<title>Feed {feed_id}</title><id>https://example.com/{feed_id}</id>{''.join(entries)}</feed>"
+            )
+        else:
+            feed = (
+                '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Feed {feed_id}</title><link>https://example.com/{feed_id}</link>"
+                f"<description>Feed {feed_id}</description>{''.join(entries)}</channel></rss>"
+            )
+        return feed.encode("utf-8")
+
+    async def handle_feed(self, request: web.Request):
+        self.requests += 1
+        feed_id = int(request.match_info["feed_id"])
+        if self.args.latency:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.args.latency / 1000))
+        if self.rng.random() < self.args.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+
+        version = self.versions.setdefault(feed_id, self.args.entries)
+        etag = f'"{feed_id}-{version}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        atom = self.args.format == "atom" or (self.args.format == "mixed" and feed_id % 2)
+        content_type = "application/atom+xml" if atom else "application/rss+xml"
+        return web.Response(
+            body=self.render(feed_id, version, atom),
+            content_type=content_type,
+            headers={"ETag": etag},
+        )
+
+    def publish(self, update_rate: float):
+        """Add a new post to a part of the feeds."""
+        for feed_id in self.versions:
+            if self.rng.random() < update_rate:
+                self.versions[feed_id] += 1
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/feed/{feed_id}", self.handle_feed)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "0.0.0.0" if self.args.hosts > 1 else "127.0.0.1", 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class FakeValueContext:
+    """Stand-in for Config's value context manager: awaitable, or used with `async with`."""
+
+    def __init__(self, value: "FakeValue"):
+        self._value = value
+        self._raw = None
+
+    def __await__(self):
+        return self._get().__await__()
+
+    async def _get(self):
+        return copy.deepcopy(self._value.data[self._value.name])
+
+    async def __aenter__(self):
+        self._raw = copy.deepcopy(self._value.data[self._value.name])
+        return self._raw
+
+    async def __aexit__(self, *exc_info):
+        await self._value.set(self._raw)
+
+
+class FakeValue:
+    def __init__(self, config: "FakeConfig", data: dict, name: str):
+        self.config = config
+        self.data = data
+        self.name = name
+
+    def __call__(self):
+        return FakeValueContext(self)
+
+    async def set(self, value):
+        self.data[self.name] = copy.deepcopy(value)
+        self.config.writes += 1
+
+
+class FakeGroup:
+    def __init__(self, config: "FakeConfig", data: dict):
+        self._config = config
+        self._data = data
+
+    def __getattr__(self, name: str):
+        return FakeValue(self._config, self._data, name)
+
+
+class FakeConfig:
+    """The parts of Config the feed loop uses, kept in memory and counting writes."""
+
+    def __init__(self):
+        self.globals = {}
+        self.channels = {}
+        self.channel_defaults = {}
+        self.writes = 0
+
+    def register_global(self, **defaults):
+        self.globals.update(defaults)
+
+    def register_channel(self, **defaults):
+        self.channel_defaults.update(defaults)
+
+    def __getattr__(self, name: str):
+        if name in self.globals:
+            return FakeValue(self, self.globals, name)
+        raise AttributeError(name)
+
+    def channel_from_id(self, channel_id: int):
+        if channel_id not in self.channels:
+            self.channels[channel_id] = copy.deepcopy(self.channel_defaults)
+        return FakeGroup(self, self.channels[channel_id])
+
+    def channel(self, channel):
+        return self.channel_from_id(channel.id)
+
+    async def all_channels(self):
+        return copy.deepcopy(self.channels)
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+        self.guild = SimpleNamespace(id=channel_id, me=None)
+        self.sent = 0
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+
+class FakeBot:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.channels = {}
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def wait_until_red_ready(self):
+        return
+
+    async def cog_disabled_in_guild(self, cog, guild):
+        return False
+
+    async def embed_requested(self, channel):
+        return False
+
+    def dispatch(self, *args, **kwargs):
+        return
+
+
+async def monitor_loop(stop: asyncio.Event, interval: float, lags: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_cycle(cog, config: FakeConfig, label: str, feed_count: int):
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop(stop, 0.01, lags))
+    writes_before = config.writes
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    await cog._load_feed_subscriptions()
+    due_urls = cog._scheduler.pop_due()
+    await cog._run_feed_cycle(due_urls)
+    elapsed = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    stop.set()
+    await monitor
+    lags.sort()
+    return {
+        "label": label,
+        "feeds": feed_count,
+        "elapsed": elapsed,
+        "feeds_per_second": feed_count / elapsed if elapsed else 0,
+        "lag_max": lags[-1] * 1000 if lags else 0,
+        "lag_p99": lags[int(len(lags) * 0.99) - 1] * 1000 if lags else 0,
+        "lag_mean": statistics.fmean(lags) * 1000 if lags else 0,
+        "peak_mib": peak / 1024 / 1024,
+        "config_writes": config.writes - writes_before,
+    }
+
+
+async def bench_feed_count(args, feed_count: int):
+    server = FakeFeedServer(args)
+    port = await server.start()
+    config = FakeConfig()
+    bot = FakeBot()
+
+    with mock.patch.object(
+        rss_module, "Config", SimpleNamespace(get_conf=lambda *a, **k: config)
+    ), mock.patch.object(rss_module, "can_user_send_messages_in", lambda *a, **k: True):
+        cog = rss_module.RSS(bot)
+        await config.max_workers.set(args.workers)
+        await config.max_per_host.set(args.per_host)
+
+        url_count = max(1, feed_count // args.subscriptions_per_url)
+        for index in range(feed_count):
+            channel_id = 1000 + index // args.feeds_per_channel
+            bot.channels.setdefault(channel_id, FakeChannel(channel_id))
+            url_index = index % url_count
+            host = f"127.0.{url_index % args.hosts // 250}.{url_index % args.hosts % 250 + 1}"
+            feeds = config.channel_from_id(channel_id)._data["feeds"]
+            feeds[f"feed{index}"] = {
+                "name": f"feed{index}",
+                "last_title": None,
+                "last_link": None,
+                "last_time": None,
+                "template": "$title\n$link",
+                "url": f"http://{host}:{port}/feed/{url_index}",
+                "template_tags": [],
+                "is_special": [],
+                "embed": False,
+                "embed_color": None,
+                "embed_image": None,
+                "embed_thumbnail": None,
+            }
+        config.writes = 0
+
+        await cog._feed_state.load()
+        results = [await run_cycle(cog, config, "first", feed_count)]
+        server.publish(args.update_rate)
+        # make every url due again for the steady state cycle
+        cog._scheduler = rss_module.FeedScheduler()
+        results.append(await run_cycle(cog, config, "steady", feed_count))
+        await cog.cog_unload()
+
+    sent = sum(channel.sent for channel in bot.channels.values())
+    await server.stop()
+    return results, server, sent
+
+
+async def main(args):
+    if not args.no_memory:
+        tracemalloc.start()
+    header = (
+        f"{'feeds':>6} {'cycle':<7} {'time (s)':>9} {'feeds/s':>9} {'lag max (ms)':>13} {'lag p99 (ms)':>13}"
+        f" {'lag mean (ms)':>14} {'peak (MiB)':>11} {'config writes':>14}"
+    )
+    print(header)
+    for feed_count in args.feeds:
+        results, server, sent = await bench_feed_count(args, feed_count)
+        for result in results:
+            print(
+                f"{result['feeds']:>6} {result['label']:<7} {result['elapsed']:>9.2f} {result['feeds_per_second']:>9.1f}"
+                f" {result['lag_max']:>13.2f} {result['lag_p99']:>13.2f} {result['lag_mean']:>14.3f}"
+                f" {result['peak_mib']:>11.1f} {result['config_writes']:>14}"
+            )
+        print(
+            f"{'':>6} server requests: {server.requests}, 304s: {server.not_modified}, messages sent: {sent}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--feeds", type=int, nargs="+", default=[100, 1000, 10000], help="feed counts to run"
+    )
+    parser.add_argument("--entries", type=int, default=20, help="entries per feed")
+    parser.add_argument("--paragraphs", type=int, default=5, help="filler paragraphs per entry")
+    parser.add_argument("--format", choices=("rss", "atom", "mixed"), default="mixed")
+    parser.add_argument("--latency", type=float, default=50, help="average server latency in ms")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.01, help="fraction of requests that fail"
+    )
+    parser.add_argument(
+        "--update-rate", type=float, default=0.1, help="fraction of feeds with a new post"
+    )
+    parser.add_argument(
+        "--subscriptions-per-url", type=int, default=1, help="channels subscribed to each url"
+    )
+    parser.add_argument("--feeds-per-channel", type=int, default=5)
+    parser.add_argument(
+        "--hosts", type=int, default=100, help="distinct loopback hosts to spread feeds over"
+    )
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="don't trace memory, tracing slows everything down a lot",
+    )
+    asyncio.run(main(parser.parse_args()))
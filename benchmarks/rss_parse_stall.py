@@ -0,0 +1,136 @@
+"""
+Measure how long RSS feed parsing stalls the event loop.
+
+Parses a synthetic feed repeatedly while a monitor task measures how late the
+event loop wakes it up, first inline on the loop (how the RSS cog used to parse),
+then through the thread and process pools the cog can use now.
+
+Run from the repository root, in an environment with the RSS cog's requirements installed:
+
+    python benchmarks/rss_parse_stall.py --entries 200 --rounds 20
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rss.parsing import append_bs4_tags, parse_feed  # noqa: E402
+
+ENTRY = """
+<item>
+    <title>Synthetic post {index}</title>
+    <link>https://example.com/posts/{index}</link>
+    <guid>https://example.com/posts/{index}</guid>
+    <pubDate>Mon, 06 Sep 2021 {hour:02d}:{minute:02d}:00 GMT</pubDate>
+    <category>news</category>
+    <category>bench</category>
+    <description><![CDATA[{content}]]></description>
+</item>
+"""
+CONTENT = (
+    "<p>Paragraph {i} with a <a href='https://example.com/{i}'>link</a> and <b>bold</b> text.</p>"
+    "<img src='https://example.com/{i}.png'/><ul><li>one</li><li>two</li></ul>"
+)
+
+
+def build_feed(entries: int, paragraphs: int) -> bytes:
+    items = []
+    for index in range(entries):
+        content = "".join(CONTENT.format(i=i) for i in range(paragraphs))
+        items.append(
+            ENTRY.format(index=index, hour=index % 24, minute=index % 60, content=content)
+        )
+    feed = (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>Benchmark</title><link>https://example.com/</link><description>Benchmark feed</description>"
+        f"{''.join(items)}</channel></rss>"
+    )
+    return feed.encode("utf-8")
+
+
+def parse_and_tag(content: bytes):
+    """What the cog does for a feed with new posts: parse it, then add the bs4 tags to every entry."""
+    feedparser_obj = parse_feed(content)
+    return [append_bs4_tags(entry) for entry in feedparser_obj.entries]
+
+
+async def monitor_loop(stop: asyncio.Event, interval: float, stalls: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stalls.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_mode(mode: str, content: bytes, rounds: int, workers: int):
+    loop = asyncio.get_running_loop()
+    if mode == "thread":
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    elif mode == "process":
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        # start the workers before measuring
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, time.sleep, 0.1) for _ in range(workers))
+        )
+    else:
+        executor = None
+
+    stop = asyncio.Event()
+    stalls = []
+    monitor = asyncio.create_task(monitor_loop(stop, 0.001, stalls))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if executor is None:
+            parse_and_tag(content)
+            await asyncio.sleep(0)
+        else:
+            await loop.run_in_executor(executor, parse_and_tag, content)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    if executor is not None:
+        executor.shutdown()
+
+    stalls.sort()
+    return {
+        "mode": mode,
+        "elapsed": elapsed,
+        "max": stalls[-1] * 1000 if stalls else 0,
+        "p99": stalls[int(len(stalls) * 0.99) - 1] * 1000 if stalls else 0,
+        "mean": statistics.fmean(stalls) * 1000 if stalls else 0,
+    }
+
+
+async def main(args):
+    content = build_feed(args.entries, args.paragraphs)
+    print(
+        f"Feed size: {len(content) / 1024:.1f} KiB, {args.entries} entries, {args.rounds} rounds"
+    )
+    print(
+        f"{'mode':<8} {'wall (s)':>9} {'max stall (ms)':>15} {'p99 stall (ms)':>15} {'mean stall (ms)':>16}"
+    )
+    for mode in ("inline", "thread", "process"):
+        result = await run_mode(mode, content, args.rounds, args.workers)
+        print(
+            f"{result['mode']:<8} {result['elapsed']:>9.2f} {result['max']:>15.2f}"
+            f" {result['p99']:>15.2f} {result['mean']:>16.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -7,15 +7,92 @@
 import asyncio
 import discord
 import heapq
+import threading
 from io import BytesIO
-from typing import List, Optional, Tuple, Union
+from typing import Iterable, List, Optional, Tuple, Union
 
 from redbot.core import checks, commands, Config
 
 import matplotlib
 matplotlib.use("agg")
-import matplotlib.pyplot as plt
-plt.switch_backend("agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+
+# channels fetched at the same time by serverchart
+_CONCURRENT_FETCHES = 3
+
+_COLORS = (
+    "r",
+    "darkorange",
+    "gold",
+    "y",
+    "olivedrab",
+    "green",
+    "darkcyan",
+    "mediumblue",
+    "darkblue",
+    "blueviolet",
+    "indigo",
+    "orchid",
+    "mediumvioletred",
+    "crimson",
+    "chocolate",
+    "yellow",
+    "limegreen",
+    "forestgreen",
+    "dodgerblue",
+    "slateblue",
+    "gray",
+)
+_LEGEND_FONT = FontProperties(size=10)
+# one figure per executor thread, cleared and drawn again for every chart
+_figures = threading.local()
+
+
+def _get_figure() -> Figure:
+    fig = getattr(_figures, "figure", None)
+    if fig is None:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        _figures.figure = fig
+    else:
+        fig.clear()
+    fig.subplots_adjust(left=0.0, bottom=0.1, right=0.45)
+    return fig
+
+
+def render_chart(top: List[Tuple[str, float]], others: float, title: str) -> BytesIO:
+    """
+    Draw the pie chart of the top members and their percentages, as a PNG.
+
+    Only touches its thread's own figure, so charts can be rendered in parallel.
+    """
+    sizes = [x[1] for x in top]
+    labels = ["{} {:g}%".format(x[0], round(x[1], 1)) for x in top]
+    if len(top) >= 20:
+        sizes = sizes + [others]
+        labels = labels + ["Others {:g}%".format(round(others, 1))]
+    fig = _get_figure()
+    ax = fig.add_subplot()
+    ax_title = ax.set_title(title, color="white")
+    ax_title.set_va("top")
+    ax_title.set_ha("center")
+    ax.axis("equal")
+    pie = ax.pie(sizes, colors=_COLORS, startangle=0)
+    ax.legend(
+        pie[0],
+        labels,
+        bbox_to_anchor=(0.7, 0.5),
+        loc="center",
+        prop=_LEGEND_FONT,
+        bbox_transform=fig.transFigure,
+        facecolor="#ffffff",
+    )
+    image_object = BytesIO()
+    fig.savefig(image_object, format="PNG", facecolor="#36393E")
+    image_object.seek(0)
+    return image_object
 
 
 class Chatchart(commands.Cog):
@@ -36,25 +113,28 @@ class Chatchart(commands.Cog):
         self.config.register_global(**default_global)
 
     @staticmethod
-    def calculate_member_perc(history: List[discord.Message]) -> dict:
+    def count_message(msg_data: dict, msg: discord.Message):
+        """Add a message to the member count"""
+        if msg.author.bot:
+            return
+        # Name formatting
+        if len(msg.author.display_name) >= 20:
+            short_name = "{}...".format(msg.author.display_name[:20]).replace("$", "\\$")
+        else:
+            short_name = msg.author.display_name.replace("$", "\\$").replace("_", "\\_ ").replace("*", "\\*")
+        whole_name = "{}#{}".format(short_name, msg.author.discriminator)
+        if whole_name in msg_data["users"]:
+            msg_data["users"][whole_name]["msgcount"] += 1
+        else:
+            msg_data["users"][whole_name] = {"msgcount": 1}
+        msg_data["total_count"] += 1
+
+    @classmethod
+    def calculate_member_perc(cls, history: Iterable[discord.Message]) -> dict:
         """Calculate the member count from the message history"""
         msg_data = {"total_count": 0, "users": {}}
         for msg in history:
-            # Name formatting
-            if len(msg.author.display_name) >= 20:
-                short_name = "{}...".format(msg.author.display_name[:20]).replace("$", "\\$")
-            else:
-                short_name = msg.author.display_name.replace("$", "\\$").replace("_", "\\_ ").replace("*", "\\*")
-            whole_name = "{}#{}".format(short_name, msg.author.discriminator)
-            if msg.author.bot:
-                pass
-            elif whole_name in msg_data["users"]:
-                msg_data["users"][whole_name]["msgcount"] += 1
-                msg_data["total_count"] += 1
-            else:
-                msg_data["users"][whole_name] = {}
-                msg_data["users"][whole_name]["msgcount"] = 1
-                msg_data["total_count"] += 1
+            cls.count_message(msg_data, msg)
         return msg_data
 
     @staticmethod
@@ -78,12 +158,7 @@ class Chatchart(commands.Cog):
 
     @staticmethod
     async def create_chart(top, others, channel_or_guild: Union[discord.Guild, discord.TextChannel]):
-        plt.clf()
-        sizes = [x[1] for x in top]
-        labels = ["{} {:g}%".format(x[0], round(x[1], 1)) for x in top]
-        if len(top) >= 20:
-            sizes = sizes + [others]
-            labels = labels + ["Others {:g}%".format(round(others, 1))]
+        """Render the chart of the counts from calculate_top in an executor"""
         if len(channel_or_guild.name) >= 19:
             if isinstance(channel_or_guild, discord.Guild):
                 channel_or_guild_name = "{}...".format(channel_or_guild.name[:19])
@@ -91,61 +166,26 @@ class Chatchart(commands.Cog):
                 channel_or_guild_name = "#{}...".format(channel_or_guild.name[:19])
         else:
             channel_or_guild_name = channel_or_guild.name
-        title = plt.title("Stats in {}".format(channel_or_guild_name), color="white")
-        title.set_va("top")
-        title.set_ha("center")
-        plt.gca().axis("equal")
-        colors = [
-            "r",
-            "darkorange",
-            "gold",
-            "y",
-            "olivedrab",
-            "green",
-            "darkcyan",
-            "mediumblue",
-            "darkblue",
-            "blueviolet",
-            "indigo",
-            "orchid",
-            "mediumvioletred",
-            "crimson",
-            "chocolate",
-            "yellow",
-            "limegreen",
-            "forestgreen",
-            "dodgerblue",
-            "slateblue",
-            "gray",
-        ]
-        pie = plt.pie(sizes, colors=colors, startangle=0)
-        plt.legend(
-            pie[0],
-            labels,
-            bbox_to_anchor=(0.7, 0.5),
-            loc="center",
-            fontsize=10,
-            bbox_transform=plt.gcf().transFigure,
-            facecolor="#ffffff",
+        return await asyncio.get_running_loop().run_in_executor(
+            None, render_chart, top, others, "Stats in {}".format(channel_or_guild_name)
         )
-        plt.subplots_adjust(left=0.0, bottom=0.1, right=0.45)
-        image_object = BytesIO()
-        plt.savefig(image_object, format="PNG", facecolor="#36393E")
-        image_object.seek(0)
-        return image_object
 
     async def fetch_channel_history(
         self,
         channel: discord.TextChannel,
         animation_message: discord.Message,
-        messages: int
-    ) -> List[discord.Message]:
-        """Fetch the history of a channel while displaying an status message with it"""
+        messages: int,
+        msg_data: dict,
+    ) -> int:
+        """
+        Count the history of a channel into msg_data while displaying an status message with it.
+
+        Messages are counted as they arrive and not kept, returns how many were fetched.
+        """
         animation_message_deleted = False
-        history = []
         history_counter = 0
         async for msg in channel.history(limit=messages):
-            history.append(msg)
+            self.count_message(msg_data, msg)
             history_counter += 1
             await asyncio.sleep(0.005)
             if history_counter % 250 == 0:
@@ -161,7 +201,7 @@ class Chatchart(commands.Cog):
                         await animation_message.edit(embed=new_embed)
                     except discord.NotFound:
                         animation_message_deleted = True
-        return history
+        return history_counter
 
     @commands.guild_only()
     @commands.command()
@@ -196,8 +236,9 @@ class Chatchart(commands.Cog):
             colour=await self.bot.get_embed_colour(location=channel)
         )
         loading_message = await ctx.send(embed=embed)
+        msg_data = {"total_count": 0, "users": {}}
         try:
-            history = await self.fetch_channel_history(channel, loading_message, messages)
+            await self.fetch_channel_history(channel, loading_message, messages, msg_data)
         except discord.errors.Forbidden:
             try:
                 await loading_message.delete()
@@ -205,7 +246,6 @@ class Chatchart(commands.Cog):
                 pass
             return await ctx.send("No permissions to read that channel.")
 
-        msg_data = self.calculate_member_perc(history)
         # If no members are found.
         if len(msg_data["users"]) == 0:
             try:
@@ -259,31 +299,28 @@ class Chatchart(commands.Cog):
             colour=await self.bot.get_embed_colour(location=ctx.channel),
         )
         global_fetch_message = await ctx.send(embed=embed)
-        global_history = []
-
-        for channel in channel_list:
-            embed = discord.Embed(
-                title=f"Fetching messages from #{channel.name}",
-                description="This might take a while...",
-                colour=await self.bot.get_embed_colour(location=channel)
-            )
-            loading_message = await ctx.send(embed=embed)
-            try:
-                history = await self.fetch_channel_history(channel, loading_message, messages)
-                global_history += history
-                await loading_message.delete()
-            except discord.errors.Forbidden:
+        msg_data = {"total_count": 0, "users": {}}
+        semaphore = asyncio.Semaphore(_CONCURRENT_FETCHES)
+
+        async def fetch(channel: discord.TextChannel):
+            async with semaphore:
+                embed = discord.Embed(
+                    title=f"Fetching messages from #{channel.name}",
+                    description="This might take a while...",
+                    colour=await self.bot.get_embed_colour(location=channel)
+                )
+                loading_message = await ctx.send(embed=embed)
                 try:
-                    await loading_message.delete()
-                except discord.NotFound:
-                    continue
-            except discord.NotFound:
+                    await self.fetch_channel_history(channel, loading_message, messages, msg_data)
+                except (discord.errors.Forbidden, discord.NotFound):
+                    pass
                 try:
                     await loading_message.delete()
                 except discord.NotFound:
-                    continue 
+                    pass
+
+        await asyncio.gather(*(fetch(channel) for channel in channel_list))
 
-        msg_data = self.calculate_member_perc(global_history)
         # If no members are found.
         if len(msg_data["users"]) == 0:
             try:
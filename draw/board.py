@@ -4,6 +4,7 @@ import typing  # isort:skip
 import typing_extensions  # isort:skip
 
 import io
+import time
 from dataclasses import dataclass
 
 import numpy as np
@@ -13,11 +14,13 @@ from .color import Color
 from .constants import (
     COLUMN_ICONS,
     COLUMN_ICONS_DICT,
+    HISTORY_MAX_DEPTH,
     IMAGE_EXTENSION,
     LB,
     MAIN_COLORS,
     MAIN_COLORS_DICT,
     PADDING,
+    PIXEL_SIZE,
     ROW_ICONS,
     ROW_ICONS_DICT,
     u200b,
@@ -46,6 +49,7 @@ class Board:
         ] = MAIN_COLORS[
             -1
         ],  # Literal[*MAIN_COLORS]
+        history_depth: typing.Optional[int] = HISTORY_MAX_DEPTH,
     ) -> None:
         self.cog: commands.Cog = cog
 
@@ -55,11 +59,26 @@ class Board:
 
         self.cursor_display: bool = True
 
-        self.initial_board: np.ndarray = np.full(
-            (self.height, self.width), self.background, dtype="object"
+        # Rendered cells, by pixel and cursor outline.
+        self.tiles: typing.List[np.ndarray] = []
+        self.tiles_indexes: typing.Dict[typing.Tuple[typing.Any, typing.Any], int] = {}
+        self.tiles_cursor_display: bool = self.cursor_display
+        self.last_render_time: typing.Optional[float] = None
+        # Last rendered image, and the tile shown in each of its cells, -1 for none.
+        self.last_frame: typing.Optional[np.ndarray] = None
+        self.last_layout: typing.Optional[np.ndarray] = None
+
+        # The board stores indexes in the palette of its pixels, and its history only the
+        # cells each step changed: (flat indexes, previous pixels, new pixel).
+        self.palette: typing.List[typing.Any] = []
+        self.palette_indexes: typing.Dict[typing.Any, int] = {}
+        self._palette_array: np.ndarray = np.empty(0, dtype="object")
+        self.pixels: np.ndarray = np.full(
+            (self.height, self.width), self.get_code(self.background), dtype=np.uint16
         )
-        self.board_history: typing.List[np.ndarray] = [self.initial_board.copy()]
-        self.board_index: int = 0
+        self.history_depth: int = history_depth
+        self.history: typing.List[typing.Tuple[np.ndarray, np.ndarray, int]] = []
+        self._board_index: int = 0
         self.set_attributes()
 
         # This is for the select tool.
@@ -106,8 +125,69 @@ class Board:
             f"\n{LB.join([f'{row_labels[idx]}{PADDING}{u200b.join(row)}' for idx, row in enumerate(self.board)])}"
         )
 
+    def get_cursor_outline(self) -> typing.Tuple[int, int, int, int]:
+        cursor = MAIN_COLORS_DICT.get(self.cursor, self.cursor)
+        if getattr(cursor, "RGBA", (0, 0, 0, 0)) == (0, 0, 0, 255):
+            return (18, 18, 20, 255)
+        if isinstance(cursor, Color) and self.cursor != "transparent":
+            return cursor.RGBA
+        return (255, 0, 0, 255)
+
+    def render_tile(
+        self,
+        image: typing.Optional[Image.Image],
+        outline: typing.Optional[typing.Tuple[int, int, int, int]] = None,
+    ) -> np.ndarray:
+        """Render a single cell, including the spacing after it, as an RGBA array."""
+        size = PIXEL_SIZE
+        sp = 1 if self.cursor_display else 0
+        tile: Image.Image = Image.new("RGBA", (size + sp, size + sp), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(tile)
+        if image is not None:
+            image = image.resize((size, size))
+            mask = Image.new("L", image.size, 0)
+            d = ImageDraw.Draw(mask)
+            d.rounded_rectangle(
+                (0, 0, image.width, image.height),
+                radius=3 if self.cursor_display else 0,
+                fill=255,
+            )
+            tile.paste(image, (0, 0, size, size), mask=mask)
+        elif self.cursor_display and outline is None:  # Transparent pixel.
+            draw.rounded_rectangle((0, 0, size, size), radius=3, outline=(0, 0, 0, 255))
+        if outline is not None:
+            draw.rounded_rectangle(
+                (0, 0, size, size), radius=3, fill=None, outline=outline, width=2
+            )
+        return np.asarray(tile)
+
+    async def get_tile(
+        self,
+        pixel: typing.Any,
+        outline: typing.Optional[typing.Tuple[int, int, int, int]] = None,
+    ) -> int:
+        """Get the index in `self.tiles` of a pixel's tile, rendering it the first time."""
+        key = (pixel, outline)
+        if (index := self.tiles_indexes.get(key)) is None:
+            image: typing.Optional[Image.Image] = (
+                await self.cog.get_pixel(MAIN_COLORS_DICT.get(pixel, pixel))
+                if not (isinstance(pixel, str) and pixel == "transparent")
+                else None
+            )
+            self.tiles.append(self.render_tile(image, outline=outline))
+            index = self.tiles_indexes[key] = len(self.tiles) - 1
+        return index
+
     async def to_image(self) -> Image:
-        height, width = len(self.board), len(self.board[0])
+        start = time.perf_counter()
+        if self.tiles_cursor_display != self.cursor_display:
+            # The tiles' size and corners depend on it.
+            self.tiles.clear()
+            self.tiles_indexes.clear()
+            self.tiles_cursor_display = self.cursor_display
+            self.last_frame = self.last_layout = None
+        height, width = self.pixels.shape
+        codes = np.unique(self.pixels)
         cursor_rows = tuple(row for row, __ in self.cursor_coords)
         cursor_cols = tuple(col for __, col in self.cursor_coords)
         row_labels = [
@@ -119,134 +199,178 @@ class Board:
             for idx, col in enumerate(self.col_labels)
         ]
 
-        size = 25
+        # Download the images of the new pixels all at once, instead of one by one.
+        await self.cog.prefetch_pixels(
+            {
+                MAIN_COLORS_DICT.get(pixel, pixel)
+                for pixel in (
+                    *(self.palette[code] for code in codes),
+                    *row_labels,
+                    *col_labels,
+                    self.cursor,
+                )
+                if (pixel, None) not in self.tiles_indexes
+                and not (isinstance(pixel, str) and pixel == "transparent")
+            }
+        )
+
+        # Map every cell to the index of its tile, then composite them all at once.
+        codes_tiles = np.zeros(len(self.palette), dtype=np.intp)
+        for code in codes:
+            codes_tiles[code] = await self.get_tile(self.palette[code])
+        tiles_map = codes_tiles[self.pixels]
+        if self.cursor_display:
+            outline = self.get_cursor_outline()
+            for row, col in self.cursor_coords:
+                tiles_map[row, col] = await self.get_tile(
+                    self.get_pixel(row, col), outline=outline
+                )
+            row_labels_tiles = [await self.get_tile(emoji) for emoji in row_labels]
+            col_labels_tiles = [await self.get_tile(emoji) for emoji in col_labels]
+            cursor_tile = (
+                await self.get_tile(self.cursor) if self.cursor != "transparent" else None
+            )
+
+        # The labels and the cursor go in the first row and column.
+        layout = np.full((height + 1, width + 1), -1, dtype=np.intp)
+        layout[1:, 1:] = tiles_map
+        if self.cursor_display:
+            layout[1:, 0] = row_labels_tiles
+            layout[0, 1:] = col_labels_tiles
+            layout[0, 0] = cursor_tile if cursor_tile is not None else -1
+
+        size = PIXEL_SIZE
         sp = 1 if self.cursor_display else 0
-        _width = size * (width + 1) + sp * width + round(size / 4)
-        _height = size * (height + 1) + sp * height + round(size / 4)
-        img: Image.Image = Image.new("RGBA", (_width, _height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        y = 0
-        for _y in range(0 if self.cursor_display else 2, height + 2):
-            if _y == 1:
-                y += round(size / 4)
-                continue
-            x = 0
-            for _x in range(0 if self.cursor_display else 2, width + 2):
-                if _x == 1:
-                    x += round(size / 4)
-                    continue
-                # draw.rounded_rectangle((x, y, x + size, y + size), radius=3, fill=(255, 255, 255), outline=(255, 0, 0) if (_y - 2, _x - 2) in self.cursor_coords else (0, 0, 0))
-                if _x == 0 and _y == 0:
-                    cursor = self.cursor
-                    if cursor == "transparent":
-                        x += size + sp
-                        continue
-                    image: Image.Image = await self.cog.get_pixel(
-                        MAIN_COLORS_DICT.get(cursor, cursor)
-                    )
-                elif _x == 0 and _y > 1:
-                    emoji = row_labels[_y - 2]
-                    image: Image.Image = await self.cog.get_pixel(emoji)
-                elif _y == 0 and _x > 1:
-                    emoji = col_labels[_x - 2]
-                    image: Image.Image = await self.cog.get_pixel(emoji)
-                else:
-                    pixel = self.board[_y - 2, _x - 2]
-                    if pixel == "transparent":
-                        if self.cursor_display:
-                            if (_y - 2, _x - 2) in self.cursor_coords:
-                                draw.rounded_rectangle(
-                                    (x, y, x + size, y + size),
-                                    radius=3,
-                                    fill=None,
-                                    outline=(
-                                        (18, 18, 20, 255)
-                                        if getattr(
-                                            MAIN_COLORS_DICT.get(self.cursor, self.cursor),
-                                            "RGBA",
-                                            (0, 0, 0, 0),
-                                        )
-                                        == (0, 0, 0, 255)
-                                        else (
-                                            MAIN_COLORS_DICT.get(self.cursor, self.cursor).RGBA
-                                            if isinstance(
-                                                MAIN_COLORS_DICT.get(self.cursor, self.cursor),
-                                                Color,
-                                            )
-                                            and self.cursor != "transparent"
-                                            else (255, 0, 0, 255)
-                                        )
-                                    ),
-                                    width=2,
-                                )
-                            else:
-                                draw.rounded_rectangle(
-                                    (x, y, x + size, y + size), radius=3, outline=(0, 0, 0, 255)
-                                )
-                        x += size + sp
-                        continue
-                    image: Image.Image = await self.cog.get_pixel(
-                        MAIN_COLORS_DICT.get(pixel, pixel)
-                    )
-                image = image.resize((size, size))
-                mask = Image.new("L", image.size, 0)
-                d = ImageDraw.Draw(mask)
-                # if self.cursor_display and (_y - 2, _x - 2) in self.cursor_coords:
-                #     d.ellipse((0, 0, image.width, image.height), fill=255)
-                # else:
-                d.rounded_rectangle(
-                    (0, 0, image.width, image.height),
-                    radius=3 if self.cursor_display else 0,
-                    fill=255,
+        step = size + sp
+        start_y = start_x = (step + round(size / 4)) if self.cursor_display else 0
+        if self.last_layout is not None and self.last_layout.shape == layout.shape:
+            # Only re-blit the cells showing another tile than in the last frame.
+            img = self.last_frame
+            for row, col in np.argwhere(layout != self.last_layout):
+                y = start_y + (row - 1) * step if row > 0 else 0
+                x = start_x + (col - 1) * step if col > 0 else 0
+                # The last cell's spacing goes past the image's border.
+                tile_height, tile_width = img[y : y + step, x : x + step].shape[:2]
+                img[y : y + step, x : x + step] = (
+                    self.tiles[layout[row, col]][:tile_height, :tile_width]
+                    if layout[row, col] != -1
+                    else 0
                 )
-                img.paste(image, (x, y, x + size, y + size), mask=mask)
-                if self.cursor_display and (_y - 2, _x - 2) in self.cursor_coords:
-                    draw.rounded_rectangle(
-                        (x, y, x + size, y + size),
-                        radius=3,
-                        fill=None,
-                        outline=(
-                            (18, 18, 20, 255)
-                            if getattr(
-                                MAIN_COLORS_DICT.get(self.cursor, self.cursor),
-                                "RGBA",
-                                (0, 0, 0, 0),
-                            )
-                            == (0, 0, 0, 255)
-                            else (
-                                MAIN_COLORS_DICT.get(self.cursor, self.cursor).RGBA
-                                if isinstance(
-                                    MAIN_COLORS_DICT.get(self.cursor, self.cursor), Color
-                                )
-                                and self.cursor != "transparent"
-                                else (255, 0, 0, 255)
-                            )
-                        ),
-                        width=2,
-                    )
-                x += size + sp
-            y += size + sp
-        return img
-
-    async def to_file(self) -> discord.File:
+        else:
+            _width = size * (width + 1) + sp * width + round(size / 4)
+            _height = size * (height + 1) + sp * height + round(size / 4)
+            img = np.zeros((_height, _width, 4), dtype=np.uint8)
+            tiles = np.stack(self.tiles)
+            # The last cell's spacing goes past the image's border.
+            end_y = min(start_y + height * step, _height)
+            end_x = min(start_x + width * step, _width)
+            cells = (
+                tiles[tiles_map].transpose(0, 2, 1, 3, 4).reshape(height * step, width * step, 4)
+            )
+            img[start_y:end_y, start_x:end_x] = cells[: end_y - start_y, : end_x - start_x]
+            if self.cursor_display:
+                column = tiles[row_labels_tiles].reshape(height * step, step, 4)
+                img[start_y:end_y, :step] = column[: end_y - start_y]
+                row = tiles[col_labels_tiles].transpose(1, 0, 2, 3).reshape(step, width * step, 4)
+                img[:step, start_x:end_x] = row[:, : end_x - start_x]
+                if cursor_tile is not None:
+                    img[:step, :step] = tiles[cursor_tile]
+        self.last_frame, self.last_layout = img, layout
+        # The frame is kept to be updated, so the image can't share its memory.
+        image: Image.Image = Image.fromarray(img.copy())
+        self.last_render_time = time.perf_counter() - start
+        self.cog.logger.debug(
+            f"Rendered a {height}x{width} board in {self.last_render_time * 1000:.1f}ms."
+        )
+        return image
+
+    async def to_file(self, *, optimize: typing.Optional[bool] = False) -> discord.File:
+        """
+        Save the board's image. Intermediate frames are compressed quickly, `optimize`
+        should be used for the final one.
+        """
         img: Image.Image = await self.to_image()
         buffer = io.BytesIO()
-        img.save(buffer, format=IMAGE_EXTENSION, optimize=True)
+        if optimize:
+            img.save(buffer, format=IMAGE_EXTENSION, optimize=True)
+        else:
+            img.save(buffer, format=IMAGE_EXTENSION, compress_level=1)
         buffer.seek(0)
         return discord.File(buffer, filename=f"image.{IMAGE_EXTENSION.lower()}")
 
+    @staticmethod
+    def get_palette_key(pixel: typing.Any) -> typing.Any:
+        # Equal colors are different objects.
+        return ("color", pixel.RGBA) if isinstance(pixel, Color) else pixel
+
+    def get_code(self, pixel: typing.Any) -> int:
+        """Get the index of a pixel in the palette, adding it if it's new."""
+        key = self.get_palette_key(pixel)
+        if (code := self.palette_indexes.get(key)) is None:
+            if len(self.palette) > np.iinfo(np.uint16).max:
+                raise ValueError("Too many different pixels on the board.")
+            code = self.palette_indexes[key] = len(self.palette)
+            self.palette.append(pixel)
+        return code
+
+    def encode(self, board: np.ndarray) -> np.ndarray:
+        return np.fromiter(
+            (self.get_code(pixel) for pixel in board.flat), dtype=np.uint16, count=board.size
+        ).reshape(board.shape)
+
+    def decode(self, pixels: np.ndarray) -> np.ndarray:
+        if len(self._palette_array) != len(self.palette):
+            self._palette_array = np.empty(len(self.palette), dtype="object")
+            self._palette_array[:] = self.palette
+        return self._palette_array[pixels]
+
+    def load_board(self, board: np.ndarray) -> None:
+        """Replace the board's pixels, and forget its history."""
+        self.pixels = self.encode(board)
+        self._palette_array = np.empty(0, dtype="object")
+        self.history = []
+        self._board_index = 0
+
+    def copy_history(self, board: typing_extensions.Self) -> None:
+        """Copy the pixels and the history of another board with the same size."""
+        self.palette = board.palette.copy()
+        self.palette_indexes = board.palette_indexes.copy()
+        # The decoding cache only follows the palette's length.
+        self._palette_array = np.empty(0, dtype="object")
+        self.pixels = board.pixels.copy()
+        self.history_depth = board.history_depth
+        self.history = board.history.copy()  # The steps are never modified.
+        self._board_index = board.board_index
+
     @property
     def board(self) -> np.ndarray:
-        return self.board_history[self.board_index]
+        """The pixels of the board. Changing this array doesn't change the board."""
+        return self.decode(self.pixels)
 
-    @board.setter
-    def board(self, board: np.ndarray):
-        self.board_history.append(board)
-        self.board_index += 1
+    @property
+    def board_index(self) -> int:
+        """The number of steps of the history applied to the board."""
+        return self._board_index
+
+    @board_index.setter
+    def board_index(self, index: int) -> None:
+        index = max(0, min(index, len(self.history)))
+        while self._board_index > index:  # Undo.
+            self._board_index -= 1
+            indexes, previous, __ = self.history[self._board_index]
+            self.pixels.flat[indexes] = previous
+        while self._board_index < index:  # Redo.
+            indexes, __, pixel = self.history[self._board_index]
+            self.pixels.flat[indexes] = pixel
+            self._board_index += 1
 
     @property
     def backup_board(self) -> np.ndarray:
-        return self.board_history[self.board_index - 1]
+        pixels = self.pixels.copy()
+        if self._board_index > 0:
+            indexes, previous, __ = self.history[self._board_index - 1]
+            pixels.flat[indexes] = previous
+        return self.decode(pixels)
 
     def modify(
         self,
@@ -264,10 +388,16 @@ class Board:
             (self.height == height, self.width == width, self.background == background)
         ):  # the attributes haven't been changed
             return
-        if np.array_equal(
-            self.initial_board, self.board
+        if np.all(
+            self.pixels == self.get_code(self.background)
         ):  # Board has only background, so replace all pixels.
-            self.__init__(cog=self.cog, height=height, width=width, background=background)
+            self.__init__(
+                cog=self.cog,
+                height=height,
+                width=width,
+                background=background,
+                history_depth=self.history_depth,
+            )
             return
         overlay = self.board
         base = np.full((height, width), background, dtype="object")
@@ -311,18 +441,24 @@ class Board:
             base_overlay_from.x : base_overlay_to.x,
         ] = overlay
         # return Board.from_board(base, background=background)
-        self.__init__(cog=self.cog, height=len(base), width=len(base[0]), background=background)
-        self.board_history = [base]
+        self.__init__(
+            cog=self.cog,
+            height=len(base),
+            width=len(base[0]),
+            background=background,
+            history_depth=self.history_depth,
+        )
+        self.load_board(base)
 
     @property
     def cursor_pixel(self) -> typing.Any:
-        return self.board[self.cursor_row, self.cursor_col]
+        return self.palette[self.pixels[self.cursor_row, self.cursor_col]]
 
     @cursor_pixel.setter
     def cursor_pixel(self, value: str) -> None:
         if not isinstance(value, str):
             raise TypeError("Value must be a string.")
-        self.board[self.cursor_row, self.cursor_col] = value
+        self.pixels[self.cursor_row, self.cursor_col] = self.get_code(value)
 
     def get_pixel(
         self,
@@ -331,7 +467,7 @@ class Board:
     ) -> typing.Any:
         row = row if row is not None else self.cursor_row
         col = col if col is not None else self.cursor_col
-        return self.board[row, col]
+        return self.palette[self.pixels[row, col]]
 
     @classmethod
     def from_board(
@@ -344,7 +480,7 @@ class Board:
         height = len(board)
         width = len(board[0])
         board_obj = cls(cog=cog, height=height, width=width, background=background)
-        board_obj.board_history = [board]
+        board_obj.load_board(board)
         return board_obj
 
     @classmethod
@@ -358,7 +494,9 @@ class Board:
         return board
 
     def clear(self) -> None:
-        self.draw(self.background, coords=np.array(np.where(self.board != self.background)).T)
+        self.draw(
+            self.background, coords=np.argwhere(self.pixels != self.get_code(self.background))
+        )
         self.clear_cursors()
 
     def draw(
@@ -371,19 +509,21 @@ class Board:
         color_pixel = getattr(color, "id", color)
         coords = coords if coords is not None else self.cursor_coords
 
-        cursor_matches = []
-        for row, col in coords:
-            if self.board[row, col] == color_pixel:
-                cursor_matches.append(True)
-            else:
-                cursor_matches.append(False)
-        if all(cursor_matches):
+        code = self.get_code(color_pixel)
+        rows, cols = np.asarray(coords, dtype=np.intp).reshape(-1, 2).T
+        indexes = np.unique(np.ravel_multi_index((rows, cols), self.pixels.shape))
+        previous = self.pixels.flat[indexes]
+        changed = previous != code
+        if not changed.any():
             return False
 
-        self.board_history = self.board_history[: self.board_index + 1]
-        self.board = self.board.copy()
-        for row, col in coords:
-            self.board[row, col] = color_pixel
+        del self.history[self._board_index :]
+        self.history.append((indexes[changed], previous[changed], code))
+        self.pixels.flat[indexes[changed]] = code
+        self._board_index += 1
+        if len(self.history) > self.history_depth:
+            del self.history[: len(self.history) - self.history_depth]
+            self._board_index = len(self.history)
         return True
 
     def clear_cursors(self, *, empty: typing.Optional[bool] = False) -> None:
@@ -0,0 +1,74 @@
+import typing  # isort:skip
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image
+
+
+class PixelCache:
+    """
+    LRU cache of the pixels' images, already downscaled to the board's pixel size.
+
+    The cache is bounded by the total size of the images' data, the least recently used
+    ones being dropped first. Images downloaded from Discord or Internet can also be saved
+    to a directory, so that they don't have to be downloaded again after a restart.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int) -> None:
+        self.path: Path = path
+        self.max_bytes: int = max_bytes
+        self.bytes: int = 0
+        self._images: typing.OrderedDict[typing.Any, Image.Image] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, key: typing.Any) -> bool:
+        return key in self._images
+
+    @staticmethod
+    def get_size(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key: typing.Any) -> typing.Optional[Image.Image]:
+        if (image := self._images.get(key)) is not None:
+            self._images.move_to_end(key)
+        return image
+
+    def set(self, key: typing.Any, image: Image.Image) -> None:
+        if (old_image := self._images.pop(key, None)) is not None:
+            self.bytes -= self.get_size(old_image)
+        self._images[key] = image
+        self.bytes += self.get_size(image)
+        while self.bytes > self.max_bytes and len(self._images) > 1:
+            __, old_image = self._images.popitem(last=False)
+            self.bytes -= self.get_size(old_image)
+
+    def get_file_path(self, key: typing.Any) -> Path:
+        return self.path / f"{hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()}.png"
+
+    def _load(self, key: typing.Any) -> typing.Optional[Image.Image]:
+        try:
+            with Image.open(self.get_file_path(key)) as image:
+                image.load()
+                return image
+        except (FileNotFoundError, OSError):  # Missing or broken file.
+            return None
+
+    def _save(self, key: typing.Any, image: Image.Image) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        file_path = self.get_file_path(key)
+        tmp_file_path = file_path.with_suffix(".tmp")
+        image.save(tmp_file_path, format="PNG")
+        os.replace(tmp_file_path, file_path)
+
+    async def load(self, key: typing.Any) -> typing.Optional[Image.Image]:
+        """Load an image saved with `save`, without adding it to the cache."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+
+    async def save(self, key: typing.Any, image: Image.Image) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._save, key, image)
@@ -131,3 +131,10 @@ DEFAULT_CACHE: typing.List[typing.Union[str, int]] = (
 )
 
 IMAGE_EXTENSION = "PNG"
+# Size of a pixel on the board images.
+PIXEL_SIZE: int = 25
+# Total size of the pixels' images kept in memory, in bytes.
+CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+MAX_CONCURRENT_DOWNLOADS: int = 8
+# Steps that can be undone.
+HISTORY_MAX_DEPTH: int = 100
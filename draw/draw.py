@@ -1,6 +1,7 @@
 from AAA3A_utils import Cog  # isort:skip
 from redbot.core import commands, app_commands  # isort:skip
 from redbot.core.bot import Red  # isort:skip
+from redbot.core.data_manager import cog_data_path  # isort:skip
 from redbot.core.i18n import Translator, cog_i18n  # isort:skip
 import discord  # isort:skip
 import typing  # isort:skip
@@ -14,13 +15,17 @@ import aiohttp
 from PIL import Image, ImageFilter, UnidentifiedImageError
 
 from .board import Board
+from .cache import PixelCache
 from .color import Color
 from .constants import (
+    CACHE_MAX_BYTES,
     DEFAULT_CACHE,
     IMAGE_EXTENSION,
     MAIN_COLORS,
+    MAX_CONCURRENT_DOWNLOADS,
     MAX_HEIGHT_OR_WIDTH,
     MIN_HEIGHT_OR_WIDTH,
+    PIXEL_SIZE,
     base_colors_options,
 )  # NOQA
 from .start_view import StartDrawView
@@ -45,9 +50,11 @@ class Draw(Cog):
         super().__init__(bot=bot)
 
         self._session: aiohttp.ClientSession = None
-        self.cache: typing.Dict[
-            typing.Union[str, int, typing.Tuple[int, int, int, int]]
-        ] = {}  # Unicode emojis, colors RGB and Discord custom emojis ids.
+        self.cache: PixelCache = PixelCache(
+            cog_data_path(self) / "pixels", max_bytes=CACHE_MAX_BYTES
+        )  # Unicode emojis, colors RGB and Discord custom emojis ids.
+        self._fetching: typing.Dict[typing.Any, asyncio.Future] = {}
+        self._downloads_semaphore: asyncio.Semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
 
     async def cog_load(self) -> None:
         await super().cog_load()
@@ -55,8 +62,11 @@ class Draw(Cog):
         asyncio.create_task(self.generate_cache())
 
     async def generate_cache(self) -> None:
-        for pixel in DEFAULT_CACHE:
-            await self.get_pixel(pixel)
+        await self.prefetch_pixels(DEFAULT_CACHE)
+
+    async def prefetch_pixels(self, pixels: typing.Iterable[typing.Any]) -> None:
+        """Get the images of all these pixels concurrently, so that they are in the cache."""
+        await asyncio.gather(*(self.get_pixel(pixel) for pixel in pixels), return_exceptions=True)
 
     async def cog_unload(self) -> None:
         if self._session is not None:
@@ -67,6 +77,39 @@ class Draw(Cog):
     def drawings(self) -> typing.Dict[discord.Message, DrawView]:
         return self.views
 
+    async def fetch_pixel(
+        self, pixel: typing.Any, key: typing.Any, url: typing.Optional[str]
+    ) -> typing.Optional[Image.Image]:
+        if url is None:
+            image = await pixel.to_image()
+        elif (image := await self.cache.load(key)) is not None:
+            self.cache.set(key, image)
+            return image
+        else:
+            async with self._downloads_semaphore:
+                async with self._session.get(url) as r:
+                    image_bytes = await r.read()
+            try:
+                image = Image.open(io.BytesIO(image_bytes))
+            except (AttributeError, UnidentifiedImageError) as e:
+                self.logger.error(
+                    f"Error when retrieving the pixel {key} ({url}) image for the cache.",
+                    exc_info=e,
+                )
+                return None
+        try:
+            image = image.filter(ImageFilter.SHARPEN)  # Maybe useless.
+        except ValueError:
+            pass
+        image = image.resize((PIXEL_SIZE, PIXEL_SIZE))
+        self.cache.set(key, image)
+        if url is not None:
+            try:
+                await self.cache.save(key, image)
+            except OSError as e:
+                self.logger.error(f"Error when saving the pixel {key} ({url}) image.", exc_info=e)
+        return image
+
     async def get_pixel(
         self,
         pixel: typing.Union[
@@ -98,30 +141,16 @@ class Draw(Cog):
                     url = f"https://emojicdn.elk.sh/{quote_plus(key)}?style=twitter"
         elif isinstance(pixel, Color):
             key = pixel.RGBA
-            if key not in self.cache:
-                url = None
-                image = await pixel.to_image()
+            url = None
         else:
             raise TypeError(pixel)
-        if key in self.cache:
-            image = self.cache[key]
-        else:
-            if url is not None:
-                async with self._session.get(url) as r:
-                    image_bytes = await r.read()
-                try:
-                    image = Image.open(io.BytesIO(image_bytes))
-                except (AttributeError, UnidentifiedImageError) as e:
-                    self.logger.error(
-                        f"Error when retrieving the pixel {key} ({url}) image for the cache.",
-                        exc_info=e,
-                    )
-                    return Image.new("RGBA", (100, 100), (0, 0, 0, 0))
-            try:
-                image = image.filter(ImageFilter.SHARPEN)  # Maybe useless.
-            except ValueError:
-                pass
-            self.cache[key] = image
+        if (image := self.cache.get(key)) is None:
+            if key not in self._fetching:
+                self._fetching[key] = asyncio.ensure_future(self.fetch_pixel(pixel, key, url))
+                self._fetching[key].add_done_callback(lambda __: self._fetching.pop(key, None))
+            image = await asyncio.shield(self._fetching[key])
+            if image is None:
+                return Image.new("RGBA", (PIXEL_SIZE, PIXEL_SIZE), (0, 0, 0, 0))
         if to_file:
             buffer = io.BytesIO()
             image.save(buffer, format=IMAGE_EXTENSION, optimize=True)
@@ -169,6 +198,5 @@ class Draw(Cog):
                 width=self.drawings[from_message].width,
                 background=background,
             )
-            board.board_history = self.drawings[from_message].board.board_history.copy()
-            board.board_index = self.drawings[from_message].board.board_index
+            board.copy_history(self.drawings[from_message].board)
         await StartDrawView(cog=self, board=board).start(ctx)
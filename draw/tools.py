@@ -2,6 +2,8 @@ from redbot.core.bot import Red  # isort:skip
 import discord  # isort:skip
 import typing  # isort:skip
 
+import collections
+
 import numpy as np
 
 from .board import Board
@@ -169,35 +171,36 @@ class FillTool(Tool):
         if self.board.cursor_pixel == color:
             return
 
-        # Use Breadth-First Search algorithm to fill an area.
+        # Use Breadth-First Search algorithm to fill an area, on the pixels' indexes in the
+        # palette, marking each cell once so that every cell is only visited once.
         initial_coords = initial_coords or (
             self.board.cursor_row,
             self.board.cursor_col,
         )
-        initial_pixel = self.board.get_pixel(*initial_coords)
-
+        pixels = self.board.pixels
+        area = pixels == pixels[initial_coords]
+        visited = np.zeros_like(area)
+        visited[initial_coords] = True
         coords = []
-        queue = [initial_coords]
-        i = 0
-
-        while i < len(queue):
-            row, col = queue[i]
-            i += 1
-            # Skip to next cell in the queue if
-            # the row is less than 0 or greater than the max row possible,
-            # the col is less than 0 or greater than the max col possible or
-            # the current pixel (or its cursor version) is not the same as the pixel to replace (or its cursor version)
-            if (
-                any((row < 0, row > self.board.cursor_row_max))
-                or any((col < 0, col > self.board.cursor_col_max))
-                or self.board.get_pixel(row, col) != initial_pixel
-                or (row, col) in coords
-            ):
-                continue
-
+        queue = collections.deque([initial_coords])
+        while queue:
+            row, col = queue.popleft()
             coords.append((row, col))
-
-            queue.extend(((row + 1, col), (row - 1, col), (row, col + 1), (row, col - 1)))
+            for next_row, next_col in (
+                (row + 1, col),
+                (row - 1, col),
+                (row, col + 1),
+                (row, col - 1),
+            ):
+                # Skip the cells outside of the board, already visited or with another pixel.
+                if (
+                    0 <= next_row <= self.board.cursor_row_max
+                    and 0 <= next_col <= self.board.cursor_col_max
+                    and area[next_row, next_col]
+                    and not visited[next_row, next_col]
+                ):
+                    visited[next_row, next_col] = True
+                    queue.append((next_row, next_col))
         return self.board.draw(coords=coords)  # Draw all the cells.
 
 
@@ -222,7 +225,9 @@ class ReplaceTool(Tool):
         """The method that is called when the tool is used."""
         color = self.board.cursor
         to_replace = self.board.cursor_pixel
-        return self.board.draw(color, coords=np.array(np.where(self.board.board == to_replace)).T)
+        return self.board.draw(
+            color, coords=np.argwhere(self.board.pixels == self.board.get_code(to_replace))
+        )
 
 
 CHANGE_AMOUNT = 17  # Change amount for Lighten & Darken tools to allow exactly 15 changes from 0 or 255, respectively.
@@ -251,7 +256,7 @@ class DarkenTool(Tool):
         """The method that is called when the tool is used."""
         coords = self.board.cursor_coords
         for coord in coords:
-            pixel = self.board.board[coord]
+            pixel = self.board.get_pixel(*coord)
             color = MAIN_COLORS_DICT.get(pixel, pixel)
             if isinstance(color, Color):
                 RGB_A = (
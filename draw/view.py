@@ -541,7 +541,7 @@ class DrawView(discord.ui.View):
 
     async def _update(self, empty: bool = False) -> None:
         self._embed: discord.Embed = await self.get_embed(self.ctx)
-        file = await self.board.to_file()
+        file = await self.board.to_file(optimize=empty)  # The last frame is optimized.
         if not empty:
             self.load_items()
         if self._message is None:
@@ -674,10 +674,8 @@ class DrawView(discord.ui.View):
         )
         self.undo.disabled = self.board.board_index == 0 or self.disabled
         self.undo.label = f"{self.board.board_index} ↶"
-        self.redo.disabled = (
-            self.board.board_index == len(self.board.board_history) - 1
-        ) or self.disabled
-        self.redo.label = f"↷ {(len(self.board.board_history) - 1) - self.board.board_index}"
+        self.redo.disabled = (self.board.board_index == len(self.board.history)) or self.disabled
+        self.redo.label = f"↷ {len(self.board.history) - self.board.board_index}"
 
     async def move_cursor(
         self,
@@ -747,7 +745,7 @@ class DrawView(discord.ui.View):
     @discord.ui.button(label="↷", style=discord.ButtonStyle.secondary)
     async def redo(self, interaction: discord.Interaction, button: discord.Button) -> None:
         await interaction.response.defer()
-        if self.board.board_index < len(self.board.board_history) - 1:
+        if self.board.board_index < len(self.board.history):
             self.board.board_index += 1
         await self._update()
 
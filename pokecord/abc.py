@@ -33,6 +33,30 @@ class MixinMeta(ABC):
     def get_name(self):
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_pokemon_at(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count_pokemon(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_pokemon(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_pokemon(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_pokemon(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def move_pokemon(self):
+        raise NotImplementedError
+
     @commands.group(name="poke")
     async def poke(self, ctx: commands.Context):
         """
@@ -0,0 +1,57 @@
+from typing import Any, Awaitable, Callable
+
+from redbot.core.config import Group
+
+
+class ConfigCache(dict):
+    """
+    Write-through cache of the Config data of every user or guild, keyed by id.
+
+    The cache is loaded in full once with `load`. After that, changes are applied one
+    value at a time with `set`, which writes to Config and the cache, or `apply` when
+    the value was already written to Config some other way.
+    """
+
+    def __init__(
+        self,
+        load_all: Callable[[], Awaitable[dict]],
+        get_group: Callable[[int], Group],
+    ):
+        super().__init__()
+        self._load_all = load_all
+        self._get_group = get_group
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    async def load(self):
+        """Replace the whole cache with the data in Config."""
+        data = await self._load_all()
+        self.clear()
+        self.update(data)
+        self.reloads += 1
+
+    def get(self, object_id: int, default=None):
+        if object_id in self:
+            self.hits += 1
+            return self[object_id]
+        self.misses += 1
+        return default
+
+    async def set(self, object_id: int, key: str, value: Any):
+        """Write a single value to Config and the cache."""
+        await self._get_group(object_id).set_raw(key, value=value)
+        await self.apply(object_id, key, value)
+
+    async def apply(self, object_id: int, key: str, value: Any):
+        """Apply a single value that was written to Config to the cache."""
+        if object_id in self:
+            self[object_id][key] = value
+        else:
+            # first change for this id, the rest of its data is the defaults
+            self[object_id] = await self._get_group(object_id).all()
+            self[object_id][key] = value
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
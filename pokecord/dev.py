@@ -1,4 +1,3 @@
-import json
 import pprint
 from typing import Optional
 
@@ -31,32 +30,35 @@ class Dev(MixinMeta):
         if pokemon is "":
             await self.spawn_pokemon(ctx.channel)
             return
-        else:
-            for i, pokemondata in enumerate(self.pokemondata):
-                name = (
-                    pokemondata.get("alias").lower()
-                    if pokemondata.get("alias")
-                    else pokemondata["name"]["english"].lower()
-                )
-                if name == pokemon:
-                    await self.spawn_pokemon(ctx.channel, pokemon=self.pokemondata[i])
-                    return
+        elif pokemon in self.dex_by_spawn_name:
+            await self.spawn_pokemon(ctx.channel, pokemon=self.dex_by_spawn_name[pokemon])
+            return
         await ctx.send("No pokemon found.")
 
+    @dev.command(name="cache")
+    async def dev_cache(self, ctx):
+        """Show how often the user and guild caches are hit and reloaded"""
+        table = [
+            [name, len(cache), cache.hits, cache.misses, f"{cache.hit_rate():.1%}", cache.reloads]
+            for name, cache in (("Users", self.usercache), ("Guilds", self.guildcache))
+        ]
+        await ctx.send(
+            box(
+                tabulate.tabulate(
+                    table, headers=["Cache", "Entries", "Hits", "Misses", "Hit rate", "Reloads"]
+                )
+            )
+        )
+
     async def get_pokemon(self, ctx, user: discord.Member, pokeid: int) -> list:
         """Returns pokemons from user list if exists"""
         if pokeid <= 0:
             return await ctx.send("The ID must be greater than 0!")
         async with ctx.typing():
-            result = await self.cursor.fetch_all(query=SELECT_POKEMON, values={"user_id": user.id})
-        pokemons = [None]
-        for data in result:
-            pokemons.append([json.loads(data[0]), data[1]])
-        if not pokemons:
-            return await ctx.send("You don't have any pokémon, trainer!")
-        if pokeid >= len(pokemons):
+            pokemon = await self.get_pokemon_at(user.id, pokeid)
+        if pokemon is None:
             return await ctx.send("There's no pokemon at that slot.")
-        return pokemons[pokeid]
+        return pokemon
 
     @dev.command(name="ivs")
     async def dev_ivs(
@@ -85,14 +87,7 @@ class Dev(MixinMeta):
             "Sp. Def": spdef,
             "Speed": speed,
         }
-        await self.cursor.execute(
-            query=UPDATE_POKEMON,
-            values={
-                "user_id": user.id,
-                "message_id": pokemon[1],
-                "pokemon": json.dumps(pokemon[0]),
-            },
-        )
+        await self.update_pokemon(user.id, pokemon[1], pokemon[0])
         await ctx.tick()
 
     @dev.command(name="stats")
@@ -122,14 +117,7 @@ class Dev(MixinMeta):
             "Sp. Def": spdef,
             "Speed": speed,
         }
-        await self.cursor.execute(
-            query=UPDATE_POKEMON,
-            values={
-                "user_id": user.id,
-                "message_id": pokemon[1],
-                "pokemon": json.dumps(pokemon[0]),
-            },
-        )
+        await self.update_pokemon(user.id, pokemon[1], pokemon[0])
         await ctx.tick()
 
     @dev.command(name="level")
@@ -141,14 +129,7 @@ class Dev(MixinMeta):
         if not isinstance(pokemon, list):
             return
         pokemon[0]["level"] = lvl
-        await self.cursor.execute(
-            query=UPDATE_POKEMON,
-            values={
-                "user_id": user.id,
-                "message_id": pokemon[1],
-                "pokemon": json.dumps(pokemon[0]),
-            },
-        )
+        await self.update_pokemon(user.id, pokemon[1], pokemon[0])
         await ctx.tick()
 
     @dev.command(name="reveal")
@@ -167,15 +148,12 @@ class Dev(MixinMeta):
         if id <= 0:
             return await ctx.send("The ID must be greater than 0!")
         async with ctx.typing():
-            result = await self.cursor.fetch_all(query=SELECT_POKEMON, values={"user_id": user.id})
-        pokemons = [None]
-        for data in result:
-            pokemons.append([json.loads(data[0]), data[1]])
-        if not pokemons:
+            amount = await self.count_pokemon(user.id)
+            pokemon = await self.get_pokemon_at(user.id, id) if amount else None
+        if not amount:
             return await ctx.send(f"{user.display_name} don't have any pokémon!")
-        if id >= len(pokemons):
+        if pokemon is None:
             return await ctx.send("There's no pokemon at that slot.")
-        pokemon = pokemons[id]
         msg = ""
         userconf = await self.user_is_global(user)
         pokeid = await userconf.pokeid()
@@ -184,20 +162,20 @@ class Dev(MixinMeta):
                 "\nTheir default pokemon may have changed. I have tried to account for this change."
             )
             await userconf.pokeid.set(pokeid - 1)
+            await self.usercache.apply(user.id, "pokeid", pokeid - 1)
         elif id == pokeid:
             msg += _(
                 "\nYou have released their selected pokemon. I have reset their selected pokemon to their first pokemon."
             )
             await userconf.pokeid.set(1)
-        if len(pokemons) == 2:  # it was their last pokemon, resets starter
+            await self.usercache.apply(user.id, "pokeid", 1)
+        if amount == 1:  # it was their last pokemon, resets starter
             await userconf.has_starter.set(False)
+            await self.usercache.apply(user.id, "has_starter", False)
             msg = _(
                 f"\n{user.display_name} has no pokemon left. I have granted them another chance to pick a starter."
             )
-        await self.cursor.execute(
-            query="DELETE FROM users where message_id = :message_id",
-            values={"message_id": pokemon[1]},
-        )
+        await self.delete_pokemon(user.id, pokemon[1], id)
         name = self.get_name(pokemon[0]["name"], user)
         await ctx.send(
             _(f"{user.display_name}'s {name} has been freed.{msg}").format(name=name, msg=msg)
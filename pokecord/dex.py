@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+log = logging.getLogger("red.flare.pokecord.dex")
+
+# merged into the dex in this order
+# galarian.json and hisuian.json aren't part of it, their records always got replaced by paldea.json
+DEX_FILES = (
+    "pokedex.json",
+    "shiny.json",
+    "legendary.json",
+    "mythical.json",
+    "paldea.json",
+    "alolan.json",
+    "megas.json",
+)
+SOURCE_FILES = DEX_FILES + ("evolve.json", "genders.json", "url.json")
+# bump when the merged data changes shape, so old snapshots get rebuilt
+SNAPSHOT_VERSION = 1
+
+
+def _load_json(datapath: Path, filename: str):
+    with open(datapath / filename, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_dex(datapath: Path) -> dict:
+    """Load and merge the bundled data files, the way the cog uses them."""
+    pokemondata = []
+    for filename in DEX_FILES:
+        pokemondata += _load_json(datapath, filename)
+    url = _load_json(datapath, "url.json")
+    for pokemon in pokemondata:
+        name = (
+            pokemon["name"]["english"]
+            if not pokemon.get("variant")
+            else pokemon.get("alias")
+            if pokemon.get("alias")
+            else pokemon["name"]["english"]
+        )
+        if "shiny" in name.lower():
+            continue
+        link = url[name]
+        if isinstance(link, list):
+            link = link[0]
+        pokemon["url"] = link
+    pokemonlist = {
+        pokemon["id"]: {
+            "name": pokemon["name"],
+            "amount": 0,
+            "id": f"#{str(pokemon['id']).zfill(3)}",
+        }
+        for pokemon in sorted(pokemondata, key=lambda x: x["id"])
+    }
+    return {
+        "pokemondata": pokemondata,
+        "pokemonlist": pokemonlist,
+        "evolvedata": _load_json(datapath, "evolve.json"),
+        "genderdata": _load_json(datapath, "genders.json"),
+    }
+
+
+def _source_stats(datapath: Path) -> Dict[str, Tuple[int, int]]:
+    stats = {}
+    for filename in SOURCE_FILES:
+        stat = os.stat(datapath / filename)
+        stats[filename] = (stat.st_size, stat.st_mtime_ns)
+    return stats
+
+
+def _source_hashes(datapath: Path) -> Dict[str, str]:
+    return {
+        filename: hashlib.blake2b((datapath / filename).read_bytes(), digest_size=16).hexdigest()
+        for filename in SOURCE_FILES
+    }
+
+
+def _read_snapshot(snapshot: Path, datapath: Path):
+    """Read the merged data from the snapshot, or None if it's missing or stale.
+
+    Returns the data and whether the snapshot's header should be rewritten."""
+    try:
+        with open(snapshot, "rb") as f:
+            header = pickle.load(f)
+            if header.get("version") != SNAPSHOT_VERSION:
+                return None, False
+            stats = _source_stats(datapath)
+            # the files were touched, e.g. by a reinstall, but may not have changed
+            stale_stats = header["stats"] != stats
+            if stale_stats and header["hashes"] != _source_hashes(datapath):
+                return None, False
+            return pickle.load(f), stale_stats
+    except FileNotFoundError:
+        return None, False
+    except Exception as exc:
+        log.warning("Ignoring unreadable dex snapshot %s.", snapshot, exc_info=exc)
+        return None, False
+
+
+def _write_snapshot(snapshot: Path, datapath: Path, data: dict):
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "stats": _source_stats(datapath),
+        "hashes": _source_hashes(datapath),
+    }
+    tmp = snapshot.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, snapshot)
+
+
+def load_dex(datapath: Path, snapshot: Path) -> dict:
+    """
+    Load the merged dex data, from the snapshot if it's up to date with the bundled files.
+
+    The snapshot is (re)built from the bundled files otherwise. It's keyed by the files'
+    sizes and mtimes, with their hashes as a fallback when only the mtimes changed.
+    """
+    start = time.perf_counter()
+    data, stale_header = _read_snapshot(snapshot, datapath)
+    source = "snapshot"
+    if data is None:
+        source = "bundled files"
+        data = merge_dex(datapath)
+    elapsed = time.perf_counter() - start
+    if source != "snapshot" or stale_header:
+        try:
+            _write_snapshot(snapshot, datapath, data)
+        except OSError as exc:
+            log.warning("Couldn't write the dex snapshot %s.", snapshot, exc_info=exc)
+    log.info(
+        "Loaded %s pokemon from the %s in %.1fms.",
+        len(data["pokemondata"]),
+        source,
+        elapsed * 1000,
+    )
+    return data
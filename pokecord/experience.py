@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+from .statements import UPDATE_XP
+from .writer import DatabaseWriter
+
+
+class ExperienceBuffer:
+    """
+    Keeps the pokemon each user is levelling in memory and buffers their xp.
+
+    `exp_gain` runs on every message, so it only reads a user's pokemon from the
+    database the first time and then changes the cached copy. Plain xp gains are
+    written in one batch by `flush`, anything else changing a user's pokemon must
+    call `forget` for that user first.
+    """
+
+    def __init__(self, writer: DatabaseWriter):
+        self._writer = writer
+        # user id -> [pokemon, message_id] of the pokemon getting the user's xp
+        self._levelling: Dict[int, list] = {}
+        # user ids with xp that isn't written yet
+        self._dirty: Set[int] = set()
+        self._lock = asyncio.Lock()
+
+    def get(self, user_id: int) -> Optional[list]:
+        return self._levelling.get(user_id)
+
+    def set(self, user_id: int, levelling: list):
+        self._levelling[user_id] = levelling
+
+    def mark_dirty(self, user_id: int):
+        self._dirty.add(user_id)
+
+    async def flush(self, user_ids: Optional[Set[int]] = None) -> int:
+        """Write the buffered xp of every user, or only of `user_ids`, in one transaction.
+
+        Returns the amount of pokemon written."""
+        async with self._lock:
+            if user_ids is None:
+                flushing, self._dirty = self._dirty, set()
+            else:
+                flushing = self._dirty & user_ids
+                self._dirty -= flushing
+            values = [
+                {
+                    "user_id": user_id,
+                    "message_id": self._levelling[user_id][1],
+                    "xp": self._levelling[user_id][0]["xp"],
+                }
+                for user_id in flushing
+                if user_id in self._levelling
+            ]
+            if not values:
+                return 0
+            try:
+                await self._writer.write(*((UPDATE_XP, value) for value in values))
+            except Exception:
+                # keep it for the next flush
+                self._dirty |= flushing
+                raise
+            return len(values)
+
+    def discard(self, user_id: int):
+        """Drop a user's cached pokemon without writing its buffered xp."""
+        self._dirty.discard(user_id)
+        self._levelling.pop(user_id, None)
+
+    async def forget(self, user_id: int):
+        """Write a user's buffered xp and drop their cached pokemon."""
+        if user_id in self._dirty:
+            await self.flush({user_id})
+        self._levelling.pop(user_id, None)
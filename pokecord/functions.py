@@ -1,3 +1,5 @@
+import json
+
 import discord
 import tabulate
 from redbot.core.i18n import Translator
@@ -6,6 +8,42 @@ from redbot.core.utils.chat_formatting import box
 _ = Translator("Pokecord", __file__)
 
 
+# Fields of a pokemon stored in their own columns, everything else goes in the JSON.
+HOT_FIELDS = {"id", "level", "xp", "variant", "gender", "nickname"}
+
+
+def pokemon_to_row(pokemon: dict) -> dict:
+    """Split a pokemon into the column values of the pokemon table."""
+    ivs = pokemon.get("ivs")
+    return {
+        "species_id": pokemon["id"],
+        "level": pokemon.get("level", 1),
+        "xp": pokemon.get("xp", 0),
+        "variant": pokemon.get("variant"),
+        "gender": pokemon.get("gender"),
+        "iv_total": sum(ivs.values()) if ivs else None,
+        "nickname": pokemon.get("nickname"),
+        "data": json.dumps(
+            {key: value for key, value in pokemon.items() if key not in HOT_FIELDS | {"sid"}}
+        ),
+    }
+
+
+def row_to_pokemon(row) -> dict:
+    """Rebuild a pokemon from a row selected with `POKEMON_COLUMNS`.
+
+    The position in the user's listing is set as `sid`."""
+    pokemon = json.loads(row[9])
+    pokemon["id"] = row[2]
+    pokemon["level"] = row[3]
+    pokemon["xp"] = row[4]
+    for key, value in (("variant", row[5]), ("gender", row[6]), ("nickname", row[8])):
+        if value is not None:
+            pokemon[key] = value
+    pokemon["sid"] = row[1]
+    return pokemon
+
+
 def chunks(l, n):
     """Yield successive n-sized chunks from l."""
     for i in range(0, len(l), n):
@@ -1,5 +1,4 @@
 import asyncio
-import copy
 import json
 from typing import Union
 
@@ -12,7 +11,7 @@ from redbot.core.utils.predicates import MessagePredicate
 
 from .abc import MixinMeta
 from .converters import Args
-from .functions import chunks, poke_embed
+from .functions import poke_embed
 from .menus import GenericMenu, PokedexFormat, PokeList, PokeListMenu, SearchFormat
 from .statements import *
 
@@ -37,13 +36,8 @@ class GeneralMixin(MixinMeta):
             )
         user = user or ctx.author
         async with ctx.typing():
-            result = await self.cursor.fetch_all(query=SELECT_POKEMON, values={"user_id": user.id})
-        pokemons = []
-        for i, data in enumerate(result, start=1):
-            poke = json.loads(data[0])
-            poke["sid"] = i
-            pokemons.append(poke)
-        if not pokemons:
+            amount = await self.count_pokemon(user.id)
+        if not amount:
             return await ctx.send(_("You don't have any pokémon, go get catching trainer!"))
         _id = await conf.pokeid()
         await ctx.send(
@@ -51,7 +45,7 @@ class GeneralMixin(MixinMeta):
             delete_after=5,
         )
         await PokeListMenu(
-            source=PokeList(pokemons),
+            source=PokeList(self, user.id, amount),
             cog=self,
             ctx=ctx,
             user=user,
@@ -80,29 +74,19 @@ class GeneralMixin(MixinMeta):
             )
             return
         async with ctx.typing():
-            result = await self.cursor.fetch_all(
-                query=SELECT_POKEMON, values={"user_id": ctx.author.id}
-            )
-        pokemons = [None]
-        for data in result:
-            pokemons.append([json.loads(data[0]), data[1]])
-        if not pokemons:
-            return await ctx.send(_("You don't have any pokémon, trainer!"))
-        if id > len(pokemons):
+            pokemon = await self.get_pokemon_at(ctx.author.id, id)
+        if pokemon is None:
             return await ctx.send(
                 _(
                     "You don't have a pokemon at that slot.\nID refers to the position within your pokémon listing.\nThis is found at the bottom of the pokemon on `[p]list`"
                 )
             )
-        pokemon = pokemons[id]
-        pokemon[0]["nickname"] = nickname
-        await self.cursor.execute(
-            query=UPDATE_POKEMON,
-            values={
-                "user_id": ctx.author.id,
-                "message_id": pokemon[1],
-                "pokemon": json.dumps(pokemon[0]),
-            },
+        await self.xp_buffer.forget(ctx.author.id)
+        await self.writer.write(
+            (
+                UPDATE_NICKNAME,
+                {"user_id": ctx.author.id, "message_id": pokemon[1], "nickname": nickname},
+            )
         )
         await ctx.send(
             _("Your {pokemon} has been nicknamed `{nickname}`").format(
@@ -124,24 +108,18 @@ class GeneralMixin(MixinMeta):
         if id <= 0:
             return await ctx.send(_("The ID must be greater than 0!"))
         async with ctx.typing():
-            result = await self.cursor.fetch_all(
-                query=SELECT_POKEMON,
-                values={"user_id": ctx.author.id},
-            )
-        pokemons = [None]
-        for data in result:
-            pokemons.append([json.loads(data[0]), data[1]])
-        if not pokemons:
+            amount = await self.count_pokemon(ctx.author.id)
+            pokemon = await self.get_pokemon_at(ctx.author.id, id) if amount else None
+        if not amount:
             return await ctx.send(_("You don't have any pokémon, trainer!"))
-        if id >= len(pokemons):
+        if pokemon is None:
             return await ctx.send(
                 _(
                     "You don't have a pokemon at that slot.\nID refers to the position within your pokémon listing.\nThis is found at the bottom of the pokemon on `[p]list`"
                 )
             )
-        pokemon = pokemons[id]
         name = self.get_name(pokemon[0]["name"], ctx.author)
-        if len(pokemons) == 2:
+        if amount == 1:
             return await ctx.send(
                 _(
                     f"**{name}** is the last pokemon you've got. You cannot release it to the wilds."
@@ -168,15 +146,14 @@ class GeneralMixin(MixinMeta):
                     "\nYour default pokemon may have changed. I have tried to account for this change."
                 )
                 await userconf.pokeid.set(pokeid - 1)
+                await self.usercache.apply(ctx.author.id, "pokeid", pokeid - 1)
             elif id == pokeid:
                 msg += _(
                     "\nYou have released your selected pokemon. I have reset your selected pokemon to your first pokemon."
                 )
                 await userconf.pokeid.set(1)
-            await self.cursor.execute(
-                query="DELETE FROM users where message_id = :message_id",
-                values={"message_id": pokemon[1]},
-            )
+                await self.usercache.apply(ctx.author.id, "pokeid", 1)
+            await self.delete_pokemon(ctx.author.id, pokemon[1], id)
             await ctx.send(_("Your {name} has been freed.{msg}").format(name=name, msg=msg))
         else:
             await ctx.send(_("Operation cancelled."))
@@ -194,24 +171,19 @@ class GeneralMixin(MixinMeta):
                 ).format(prefix=ctx.clean_prefix)
             )
         async with ctx.typing():
-            result = await self.cursor.fetch_all(
-                query="""SELECT pokemon, message_id from users where user_id = :user_id""",
-                values={"user_id": ctx.author.id},
-            )
-            pokemons = [None]
-            for data in result:
-                pokemons.append([json.loads(data[0]), data[1]])
-            if not pokemons:
+            amount = await self.count_pokemon(ctx.author.id)
+            if not amount:
                 return await ctx.send(_("You don't have any pokemon to select."))
             if isinstance(_id, str):
                 if _id == "latest":
-                    _id = len(pokemons) - 1
+                    _id = amount
                 else:
                     await ctx.send(
                         _("Unidentified keyword, the only supported action is `latest` as of now.")
                     )
                     return
-            if _id < 1 or _id > len(pokemons) - 1:
+            pokemon = await self.get_pokemon_at(ctx.author.id, _id) if 1 <= _id <= amount else None
+            if pokemon is None:
                 return await ctx.send(
                     _(
                         "You've specified an invalid ID.\nID refers to the position within your pokémon listing.\nThis is found at the bottom of the pokemon on `[p]list`"
@@ -219,12 +191,13 @@ class GeneralMixin(MixinMeta):
                 )
             await ctx.send(
                 _("You have selected {pokemon} as your default pokémon.").format(
-                    pokemon=self.get_name(pokemons[_id][0]["name"], ctx.author)
+                    pokemon=self.get_name(pokemon[0]["name"], ctx.author)
                 )
             )
         conf = await self.user_is_global(ctx.author)
         await conf.pokeid.set(_id)
-        await self.update_user_cache()
+        await self.usercache.apply(ctx.author.id, "pokeid", _id)
+        await self.xp_buffer.forget(ctx.author.id)
 
     @commands.command()
     @commands.max_concurrency(1, commands.BucketType.user)
@@ -232,17 +205,11 @@ class GeneralMixin(MixinMeta):
         """Check your caught pokémon!"""
         async with ctx.typing():
             pokemons = await self.config.user(ctx.author).pokeids()
-            pokemonlist = copy.deepcopy(self.pokemonlist)
-            for i, pokemon in enumerate(pokemonlist, start=1):
-                if str(pokemon) in pokemons:
-                    pokemonlist[i]["amount"] = pokemons[str(pokemon)]
-            a = [value for value in pokemonlist.items()]
-            chunked = [item for item in chunks(a, 20)]
             await GenericMenu(
-                source=PokedexFormat(chunked),
+                source=PokedexFormat(self.pokemonlist, pokemons),
                 delete_message_after=False,
                 cog=self,
-                len_poke=len(pokemonlist),
+                len_poke=len(self.pokemonlist),
             ).start(
                 ctx=ctx,
                 wait=False,
@@ -261,53 +228,32 @@ class GeneralMixin(MixinMeta):
             `--gender` | `--g` - Search by gender.
             `--iv` | - Search by total IV.
         """
+        if args["names"]:
+            names = self.dex_species_by_name.get(args["names"].lower(), ())
+            search, values = SEARCH_BY_NAME, {"names": json.dumps(sorted(names))}
+        elif args["level"]:
+            search, values = SEARCH_BY_LEVEL, {"level": args["level"][0]}
+        elif args["id"]:
+            search, values = SEARCH_BY_ID, {"id": args["id"][0]}
+        elif args["variant"]:
+            search, values = SEARCH_BY_VARIANT, {"variant": args["variant"].lower()}
+        elif args["iv"]:
+            search, values = SEARCH_BY_IV, {"iv": args["iv"][0]}
+        elif args["gender"]:
+            search, values = SEARCH_BY_GENDER, {"gender": args["gender"].lower()}
+        else:
+            search, values = SEARCH_BY_TYPE, {"type": args["type"].lower()}
         async with ctx.typing():
-            result = await self.cursor.fetch_all(
-                query="""SELECT pokemon, message_id from users where user_id = :user_id""",
-                values={"user_id": ctx.author.id},
+            await self.xp_buffer.flush({ctx.author.id})
+            amount = await self.cursor.fetch_val(
+                query=COUNT_SEARCH_POKEMON.format(search=search),
+                values={"user_id": ctx.author.id, **values},
             )
-            if not result:
-                await ctx.send(_("You don't have any pokémon trainer!"))
-            pokemons = [None]
-            for data in result:
-                pokemons.append([json.loads(data[0]), data[1]])
-            correct = ""
-            for i, poke in enumerate(pokemons[1:], 1):
-                name = self.get_name(poke[0]["name"], ctx.author)
-                poke_str = _(
-                    "{pokemon} **|** Level: {level} **|** ID: {id} **|** Index: {index}\n"
-                ).format(pokemon=name, level=poke[0]["level"], id=poke[0]["id"], index=i)
-                if args["names"]:
-                    if name.lower() == args["names"].lower():
-                        correct += poke_str
-                elif args["level"]:
-                    if poke[0]["level"] == args["level"][0]:
-                        correct += poke_str
-                elif args["id"]:
-                    if poke[0]["id"] == args["id"][0]:
-                        correct += poke_str
-                elif args["variant"]:
-                    if poke[0].get("variant", "None").lower() == args["variant"].lower():
-                        correct += poke_str
-                elif args["iv"]:
-                    if sum(poke[0]["ivs"].values()) == args["iv"][0]:
-                        correct += poke_str
-                elif args["gender"]:
-                    if (
-                        args["gender"].lower()
-                        == poke[0].get("gender", "No Gender").lower().split()[0]
-                    ):
-                        correct += poke_str
-                elif args["type"]:
-                    if args["type"].lower() in [x.lower() for x in poke[0]["type"]]:
-                        correct += poke_str
-
-            if not correct:
+            if not amount:
                 await ctx.send("No pokémon returned for that search.")
                 return
-            content = list(pagify(correct, page_length=1024))
             await GenericMenu(
-                source=SearchFormat(content),
+                source=SearchFormat(self, ctx.author.id, search, values, amount),
                 delete_message_after=False,
             ).start(ctx=ctx, wait=False)
 
@@ -323,26 +269,21 @@ class GeneralMixin(MixinMeta):
                 ).format(prefix=ctx.clean_prefix)
             )
         user = ctx.author
-        async with ctx.typing():
-            result = await self.cursor.fetch_all(query=SELECT_POKEMON, values={"user_id": user.id})
-        pokemons = []
-        for i, data in enumerate(result, start=1):
-            poke = json.loads(data[0])
-            poke["sid"] = i
-            pokemons.append(poke)
-        if not pokemons:
-            return await ctx.send(_("You don't have any pokémon, go get catching trainer!"))
         _id = await conf.pokeid()
-        try:
-            pokemon = pokemons[_id - 1]
-        except IndexError:
+        async with ctx.typing():
+            selected = await self.get_pokemon_at(user.id, _id)
+            if selected is None and not await self.count_pokemon(user.id):
+                return await ctx.send(_("You don't have any pokémon, go get catching trainer!"))
+        if selected is None:
             await ctx.send(
                 _(
                     "An error occured trying to find your pokemon at slot {slotnum}\nAs a result I have set your default pokemon to 1."
                 ).format(slotnum=_id)
             )
             await conf.pokeid.set(1)
+            await self.usercache.apply(user.id, "pokeid", 1)
+            await self.xp_buffer.forget(user.id)
             return
         else:
-            embed, _file = await poke_embed(self, ctx, pokemon, file=True)
+            embed, _file = await poke_embed(self, ctx, selected[0], file=True)
             await ctx.send(embed=embed, file=_file)
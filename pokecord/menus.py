@@ -1,6 +1,6 @@
 import asyncio
 import contextlib
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, List, Optional
 
 import discord
 import tabulate
@@ -9,7 +9,8 @@ from redbot.core.i18n import Translator
 from redbot.core.utils.predicates import MessagePredicate
 from redbot.vendored.discord.ext import menus
 
-from .functions import poke_embed
+from .functions import poke_embed, row_to_pokemon
+from .statements import SEARCH_POKEMON
 
 _ = Translator("Pokecord", __file__)
 
@@ -142,11 +143,28 @@ class PokeListMenu(menus.MenuPages, inherit_buttons=False):
         await self.ctx.invoke(command, _id=self.current_page + 1)
 
 
-class PokeList(menus.ListPageSource):
-    def __init__(self, entries: Iterable[str]):
-        super().__init__(entries, per_page=1)
+class PokeList(menus.PageSource):
+    """A user's pokemon, one per page. Only the pokemon on display is fetched."""
 
-    async def format_page(self, menu: PokeListMenu, pokemon: Dict) -> str:
+    def __init__(self, cog: commands.Cog, user_id: int, amount: int):
+        self.cog = cog
+        self.user_id = user_id
+        self.amount = amount
+
+    def is_paginating(self) -> bool:
+        return self.amount > 1
+
+    def get_max_pages(self) -> int:
+        return self.amount
+
+    async def get_page(self, page_number: int) -> Optional[Dict]:
+        pokemon = await self.cog.get_pokemon_at(self.user_id, page_number + 1)
+        # None if it was released or traded since the listing started
+        return pokemon[0] if pokemon is not None else None
+
+    async def format_page(self, menu: PokeListMenu, pokemon: Optional[Dict]):
+        if pokemon is None:
+            return _("There's no pokémon at this slot anymore.")
         embed = await poke_embed(menu.cog, menu.ctx, pokemon, menu=self)
         return embed
 
@@ -260,11 +278,56 @@ class GenericMenu(menus.MenuPages, inherit_buttons=False):
         await self.show_page(self._source.get_max_pages() - 1)
 
 
-class SearchFormat(menus.ListPageSource):
-    def __init__(self, entries: Iterable[str]):
-        super().__init__(entries, per_page=1)
+class SearchFormat(menus.PageSource):
+    """Results of a pokemon search. Every page is fetched from the database when it's shown.
+
+    `search` is one of the SEARCH_BY_* filters, with its parameters in `values`,
+    and `amount` the amount of pokemon it matches."""
+
+    def __init__(
+        self,
+        cog: commands.Cog,
+        user_id: int,
+        search: str,
+        values: dict,
+        amount: int,
+        *,
+        per_page: int = 15,
+    ):
+        self.cog = cog
+        self.search = search
+        self.values = {"user_id": user_id, **values}
+        self.amount = amount
+        self.per_page = per_page
+
+    def is_paginating(self) -> bool:
+        return self.amount > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, -(-self.amount // self.per_page))
+
+    async def get_page(self, page_number: int) -> List:
+        return await self.cog.cursor.fetch_all(
+            query=SEARCH_POKEMON.format(search=self.search),
+            values={
+                **self.values,
+                "limit": self.per_page,
+                "offset": page_number * self.per_page,
+            },
+        )
 
-    async def format_page(self, menu: GenericMenu, string: str) -> str:
+    async def format_page(self, menu: GenericMenu, rows: List) -> str:
+        string = ""
+        for row in rows:
+            pokemon = row_to_pokemon(row)
+            string += _(
+                "{pokemon} **|** Level: {level} **|** ID: {id} **|** Index: {index}\n"
+            ).format(
+                pokemon=self.cog.get_name(pokemon["name"], menu.ctx.author),
+                level=pokemon["level"],
+                id=pokemon["id"],
+                index=pokemon["sid"],
+            )
         embed = discord.Embed(
             title="Pokemon Search",
             color=await menu.ctx.embed_color(),
@@ -278,9 +341,37 @@ class SearchFormat(menus.ListPageSource):
         return embed
 
 
-class PokedexFormat(menus.ListPageSource):
-    def __init__(self, entries: Iterable[str]):
-        super().__init__(entries, per_page=1)
+class PokedexFormat(menus.PageSource):
+    """The whole dex, with how many of each pokemon a user caught. Pages are built when shown.
+
+    `caught` maps the pokemon's id, as a string, to how many were caught."""
+
+    def __init__(
+        self, pokemonlist: Dict[int, Dict], caught: Dict[str, int], *, per_page: int = 20
+    ):
+        self.ids = list(pokemonlist)
+        self.pokemonlist = pokemonlist
+        self.caught = caught
+        self.per_page = per_page
+
+    def is_paginating(self) -> bool:
+        return len(self.ids) > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, -(-len(self.ids) // self.per_page))
+
+    async def get_page(self, page_number: int) -> List:
+        start = page_number * self.per_page
+        return [
+            (
+                pokemon_id,
+                {
+                    **self.pokemonlist[pokemon_id],
+                    "amount": self.caught.get(str(pokemon_id), 0),
+                },
+            )
+            for pokemon_id in self.ids[start : start + self.per_page]
+        ]
 
     async def format_page(self, menu: GenericMenu, item: List) -> str:
         embed = discord.Embed(title=_("Pokédex"), color=await menu.ctx.embed_colour())
@@ -305,7 +396,7 @@ class PokedexFormat(menus.ListPageSource):
             )
         if menu.current_page == 0:
             embed.description = _("You've caught {total} out of {amount} pokémon.").format(
-                total=len(await menu.cog.config.user(menu.ctx.author).pokeids()),
+                total=len(self.caught),
                 amount=menu.len_poke,
             )
         return embed
@@ -1,25 +1,35 @@
 import asyncio
-import concurrent.futures
+import collections
+import copy
 import datetime
 import json
 import logging
 import random
 import string
+import time
 from abc import ABC
+from typing import Optional
 
 import apsw
 import discord
+import tabulate
 from databases import Database
 from redbot.core import Config, commands
 from redbot.core.data_manager import bundled_data_path, cog_data_path
 from redbot.core.i18n import Translator, cog_i18n, set_contextual_locales_from_guild
-from redbot.core.utils.chat_formatting import escape, humanize_list
+from redbot.core.utils.chat_formatting import box, escape, humanize_list
 
+from .cache import ConfigCache
 from .dev import Dev
+from .dex import load_dex
+from .experience import ExperienceBuffer
+from .functions import pokemon_to_row, row_to_pokemon
 from .general import GeneralMixin
+from .sampler import AliasSampler
 from .settings import SettingsMixin
 from .statements import *
 from .trading import TradeMixin
+from .writer import DatabaseWriter
 
 log = logging.getLogger("red.flare.pokecord")
 
@@ -30,6 +40,8 @@ GENDERS = [
     "Female \N{FEMALE SIGN}\N{VARIATION SELECTOR-16}",
 ]
 _MIGRATION_VERSION = 9
+# seconds between writes of the xp buffered by exp_gain
+_XP_FLUSH_INTERVAL = 30
 
 
 class CompositeMetaClass(type(commands.Cog), type(ABC)):
@@ -48,7 +60,7 @@ class Pokecord(
 ):
     """Ava's Pokemon adapted to use on Red."""
 
-    __version__ = "0.0.1-alpha-23"
+    __version__ = "0.0.1-alpha-24"
     __author__ = "flare"
 
     def format_help_for_context(self, ctx):
@@ -67,6 +79,7 @@ class Pokecord(
             spawnchance=[20, 120],
             hintcost=1000,
             spawnloop=False,
+            checkpoint_interval=0,
             migration=1,
         )
         defaults_guild = {
@@ -90,17 +103,25 @@ class Pokecord(
         self.config.register_channel(pokemon=None)
         self.datapath = f"{bundled_data_path(self)}"
         self.maybe_spawn = {}
-        self.guildcache = {}
-        self.usercache = {}
+        self.guildcache = ConfigCache(self.config.all_guilds, self.config.guild_from_id)
+        # TODO: Support guild
+        self.usercache = ConfigCache(self.config.all_users, self.config.user_from_id)
         self.spawnchance = []
         self.cursor = Database(f"sqlite:///{cog_data_path(self)}/pokemon.db")
-        self._executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.writer = DatabaseWriter(self.cursor)
         self.bg_loop_task = None
+        self.xp_buffer = ExperienceBuffer(self.writer)
+        self.xp_flush_task = None
 
-    def cog_unload(self):
-        self._executor.shutdown()
+    async def cog_unload(self):
         if self.bg_loop_task:
             self.bg_loop_task.cancel()
+        if self.xp_flush_task:
+            self.xp_flush_task.cancel()
+        try:
+            await self.xp_buffer.flush()
+        finally:
+            await self.writer.close()
 
     async def initalize(self):
         await self.cursor.connect()
@@ -108,61 +129,24 @@ class Pokecord(
         await self.cursor.execute(PRAGMA_wal_autocheckpoint)
         await self.cursor.execute(PRAGMA_read_uncommitted)
         await self.cursor.execute(POKECORD_CREATE_POKECORD_TABLE)
-        with open(f"{self.datapath}/pokedex.json", encoding="utf-8") as f:
-            pdata = json.load(f)
-        with open(f"{self.datapath}/evolve.json", encoding="utf-8") as f:
-            self.evolvedata = json.load(f)
-        with open(f"{self.datapath}/genders.json", encoding="utf-8") as f:
-            self.genderdata = json.load(f)
-        with open(f"{self.datapath}/shiny.json", encoding="utf-8") as f:
-            sdata = json.load(f)
-        with open(f"{self.datapath}/legendary.json", encoding="utf-8") as f:
-            ldata = json.load(f)
-        with open(f"{self.datapath}/mythical.json", encoding="utf-8") as f:
-            mdata = json.load(f)
-        with open(f"{self.datapath}/galarian.json", encoding="utf-8") as f:
-            gdata = json.load(f)
-        with open(f"{self.datapath}/hisuian.json", encoding="utf-8") as f:
-            gdata = json.load(f)
-        with open(f"{self.datapath}/paldea.json", encoding="utf-8") as f:
-            gdata = json.load(f)
-        with open(f"{self.datapath}/alolan.json", encoding="utf-8") as f:
-            adata = json.load(f)
-        with open(f"{self.datapath}/megas.json", encoding="utf-8") as f:
-            megadata = json.load(f)
-        self.pokemondata = pdata + sdata + ldata + mdata + gdata + adata + megadata
-        with open(f"{self.datapath}/url.json", encoding="utf-8") as f:
-            url = json.load(f)
-        for pokemon in self.pokemondata:
-            name = (
-                pokemon["name"]["english"]
-                if not pokemon.get("variant")
-                else pokemon.get("alias")
-                if pokemon.get("alias")
-                else pokemon["name"]["english"]
-            )
-            if "shiny" in name.lower():
-                continue
-            link = url[name]
-            if isinstance(link, list):
-                link = link[0]
-            pokemon["url"] = link
-
-        self.spawnchances = [x["spawnchance"] for x in self.pokemondata]
-        self.pokemonlist = {
-            pokemon["id"]: {
-                "name": pokemon["name"],
-                "amount": 0,
-                "id": f"#{str(pokemon['id']).zfill(3)}",
-            }
-            for pokemon in sorted((self.pokemondata), key=lambda x: x["id"])
-        }
-        if await self.config.migration() < _MIGRATION_VERSION:
-            self.usercache = await self.config.all_users()
-            for user in self.usercache:
+        await self.cursor.execute(POKECORD_CREATE_ORDINAL_INDEX)
+        self.writer.checkpoint_interval = await self.config.checkpoint_interval()
+        self.writer.start()
+        dex = await self.bot.loop.run_in_executor(
+            None, load_dex, bundled_data_path(self), cog_data_path(self) / "dex.pickle"
+        )
+        self.pokemondata = dex["pokemondata"]
+        self.pokemonlist = dex["pokemonlist"]
+        self.evolvedata = dex["evolvedata"]
+        self.genderdata = dex["genderdata"]
+        self.build_dex_indexes()
+        legacy_table = await self.cursor.fetch_one(query=SELECT_LEGACY_TABLE) is not None
+        if legacy_table and await self.config.migration() < _MIGRATION_VERSION:
+            writes = []
+            for user in await self.config.all_users():
                 await self.config.user_from_id(user).pokeids.clear()
                 result = await self.cursor.fetch_all(
-                    query=SELECT_POKEMON,
+                    query=SELECT_LEGACY_POKEMON,
                     values={"user_id": user},
                 )
                 async with self.config.user_from_id(user).pokeids() as pokeids:
@@ -189,22 +173,60 @@ class Pokecord(
                                 "Speed": random.randint(0, 31),
                             }
 
-                        await self.cursor.execute(
-                            query=UPDATE_POKEMON,
-                            values={
-                                "user_id": user,
-                                "message_id": data[1],
-                                "pokemon": json.dumps(poke),
-                            },
+                        writes.append(
+                            self.writer.submit(
+                                (
+                                    UPDATE_LEGACY_POKEMON,
+                                    {
+                                        "user_id": user,
+                                        "message_id": data[1],
+                                        "pokemon": json.dumps(poke),
+                                    },
+                                )
+                            )
                         )
-                await self.config.migration.set(_MIGRATION_VERSION)
+            # don't record the migration if any of the rows failed, so it runs again next time
+            results = await asyncio.gather(*writes, return_exceptions=True)
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                raise errors[0]
+            await self.config.migration.set(_MIGRATION_VERSION)
             log.info("Ava's Pokemon Migration complete.")
+        if legacy_table:
+            await self.migrate_legacy_table()
 
         await self.update_guild_cache()
         await self.update_spawn_chance()
         await self.update_user_cache()
         if await self.config.spawnloop():
             self.bg_loop_task = self.bot.loop.create_task(self.random_spawn())
+        self.xp_flush_task = self.bot.loop.create_task(self.flush_xp_loop())
+
+    async def migrate_legacy_table(self):
+        """Move every pokemon from the old `users` table, which kept the whole pokemon as JSON,
+        to the `pokemon` table. The old table is kept as `users_legacy`."""
+        log.info("Migrating Ava's Pokemon to the new database schema.")
+        result = await self.cursor.fetch_all(query=SELECT_ALL_LEGACY_POKEMON)
+        ordinals = collections.Counter()
+        values = []
+        for data in result:
+            ordinals[data[0]] += 1
+            values.append(
+                {
+                    "user_id": data[0],
+                    "message_id": data[1],
+                    "ordinal": ordinals[data[0]],
+                    **pokemon_to_row(json.loads(data[2])),
+                }
+            )
+        await self.writer.write(
+            *((INSERT_MIGRATED_POKEMON, value) for value in values), (RENAME_LEGACY_TABLE, {})
+        )
+        log.info(
+            "Ava's Pokemon schema migration complete, moved %s pokemon of %s users.",
+            len(values),
+            len(ordinals),
+        )
 
     async def random_spawn(self):
         await self.bot.wait_until_ready()
@@ -231,11 +253,19 @@ class Pokecord(
             except Exception as exc:
                 log.error("Exception in pokemon auto spawning: ", exc_info=exc)
 
+    async def flush_xp_loop(self):
+        while True:
+            await asyncio.sleep(_XP_FLUSH_INTERVAL)
+            try:
+                await self.xp_buffer.flush()
+            except Exception as exc:
+                log.error("Exception writing pokemon xp: ", exc_info=exc)
+
     async def update_guild_cache(self):
-        self.guildcache = await self.config.all_guilds()
+        await self.guildcache.load()
 
     async def update_user_cache(self):
-        self.usercache = await self.config.all_users()  # TODO: Support guild
+        await self.usercache.load()
 
     async def update_spawn_chance(self):
         self.spawnchance = await self.config.spawnchance()
@@ -252,8 +282,38 @@ class Pokecord(
             return self.config.user(user)
         return self.config.member(user)
 
+    def build_dex_indexes(self):
+        """Build the spawn sampler and the name lookups over `pokemondata`."""
+        self.spawn_sampler = AliasSampler(
+            self.pokemondata, [x["spawnchance"] for x in self.pokemondata]
+        )
+        # (english name, variant) -> pokemon, (english name, None) is the base form
+        self.dex_by_name = {}
+        # lowercase alias or english name -> pokemon, as used by `[p]poke dev spawn`
+        self.dex_by_spawn_name = {}
+        # any lowercase localized name -> english names of the pokemon with that name
+        self.dex_species_by_name = {}
+        for pokemon in self.pokemondata:
+            english = pokemon["name"]["english"]
+            self.dex_by_name.setdefault((english, pokemon.get("variant")), pokemon)
+            self.dex_by_spawn_name.setdefault((pokemon.get("alias") or english).lower(), pokemon)
+            names = self.get_pokemon_name(pokemon)
+            names.add(english.translate(str.maketrans("", "", PUNCT)).lower())
+            for name in names:
+                self.dex_species_by_name.setdefault(name, set()).add(english)
+        # pokemon only found as a variant still evolve from their base name
+        for pokemon in self.pokemondata:
+            self.dex_by_name.setdefault((pokemon["name"]["english"], None), pokemon)
+
     def pokemon_choose(self):
-        return random.choices(self.pokemondata, weights=self.spawnchances, k=1)[0]
+        return self.spawn_sampler.choice()
+
+    def is_pokemon_name(self, pokemon: dict, name: str) -> bool:
+        """Whether a name is one of the names of a pokemon, in any language, or its alias."""
+        name = name.lower()
+        if pokemon.get("alias") and pokemon["alias"].lower() == name:
+            return True
+        return pokemon["name"]["english"] in self.dex_species_by_name.get(name, ())
 
     def gender_choose(self, name):
         poke = self.genderdata.get(name, None)
@@ -277,8 +337,8 @@ class Pokecord(
             "jp": names["japanese"],
         }
         return (
-            localnames[self.usercache[user.id]["locale"]]
-            if localnames[self.usercache[user.id]["locale"]] is not None
+            localnames[userconf["locale"]]
+            if localnames[userconf["locale"]] is not None
             else localnames["en"]
         )
 
@@ -290,6 +350,70 @@ class Pokecord(
             if pokemon["name"][name] is not None
         }
 
+    async def get_pokemon_at(self, user_id: int, ordinal: int) -> Optional[list]:
+        """Get `[pokemon, message_id]` for the pokemon at a position in a user's listing."""
+        await self.xp_buffer.flush({user_id})
+        row = await self.cursor.fetch_one(
+            query=SELECT_POKEMON_BY_ORDINAL, values={"user_id": user_id, "ordinal": ordinal}
+        )
+        if row is None:
+            return None
+        return [row_to_pokemon(row), row[0]]
+
+    async def count_pokemon(self, user_id: int) -> int:
+        return await self.cursor.fetch_val(query=COUNT_POKEMON, values={"user_id": user_id})
+
+    @staticmethod
+    def _insert_statement(user_id: int, message_id: int, pokemon: dict):
+        return (
+            INSERT_POKEMON,
+            {"user_id": user_id, "message_id": message_id, **pokemon_to_row(pokemon)},
+        )
+
+    @staticmethod
+    def _delete_statements(user_id: int, message_id: int, ordinal: int):
+        # moves the pokemon after it up a position in the listing
+        return (
+            (DELETE_POKEMON, {"user_id": user_id, "message_id": message_id}),
+            (SHIFT_ORDINALS_OUT, {"user_id": user_id, "ordinal": ordinal}),
+            (SHIFT_ORDINALS_DOWN, {"user_id": user_id}),
+        )
+
+    async def insert_pokemon(self, user_id: int, message_id: int, pokemon: dict):
+        await self.xp_buffer.forget(user_id)
+        await self.writer.write(self._insert_statement(user_id, message_id, pokemon))
+
+    async def update_pokemon(self, user_id: int, message_id: int, pokemon: dict):
+        await self.xp_buffer.forget(user_id)
+        await self.writer.write(
+            (
+                UPDATE_POKEMON,
+                {"user_id": user_id, "message_id": message_id, **pokemon_to_row(pokemon)},
+            )
+        )
+
+    async def delete_pokemon(self, user_id: int, message_id: int, ordinal: int):
+        """Delete a pokemon and move the ones after it up a position in the listing."""
+        await self.xp_buffer.forget(user_id)
+        await self.writer.write(*self._delete_statements(user_id, message_id, ordinal))
+
+    async def move_pokemon(
+        self,
+        user_id: int,
+        message_id: int,
+        ordinal: int,
+        pokemon: dict,
+        to_user_id: int,
+        to_message_id: int,
+    ):
+        """Give a pokemon to another user, at the end of their listing."""
+        await self.xp_buffer.forget(user_id)
+        await self.xp_buffer.forget(to_user_id)
+        await self.writer.write(
+            *self._delete_statements(user_id, message_id, ordinal),
+            self._insert_statement(to_user_id, to_message_id, pokemon),
+        )
+
     @commands.command()
     async def starter(self, ctx, pokemon: str = None):
         """Choose your starter pokémon!"""
@@ -366,15 +490,9 @@ class Pokecord(
         }
         starter["gender"] = self.gender_choose(starter["name"]["english"])
 
-        await self.cursor.execute(
-            query=INSERT_POKEMON,
-            values={
-                "user_id": ctx.author.id,
-                "message_id": ctx.message.id,
-                "pokemon": json.dumps(starter),
-            },
-        )
+        await self.insert_pokemon(ctx.author.id, ctx.message.id, starter)
         await conf.has_starter.set(True)
+        await self.usercache.apply(ctx.author.id, "has_starter", True)
 
     @commands.command()
     @commands.cooldown(1, 30, commands.BucketType.member)
@@ -417,13 +535,7 @@ class Pokecord(
             )
         pokemonspawn = await self.config.channel(ctx.channel).pokemon()
         if pokemonspawn is not None:
-            names = self.get_pokemon_name(pokemonspawn)
-            names.add(
-                pokemonspawn["name"]["english"].translate(str.maketrans("", "", PUNCT)).lower()
-            )
-            if pokemonspawn.get("alias"):
-                names.add(pokemonspawn["alias"].lower())
-            if pokemon.lower() not in names:
+            if not self.is_pokemon_name(pokemonspawn, pokemon):
                 return await ctx.send(_("That's not the correct pokemon"))
             if await self.config.channel(ctx.channel).pokemon() is not None:
                 await self.config.channel(ctx.channel).pokemon.clear()
@@ -462,14 +574,7 @@ class Pokecord(
                 "Sp. Def": random.randint(0, 31),
                 "Speed": random.randint(0, 31),
             }
-            await self.cursor.execute(
-                query=INSERT_POKEMON,
-                values={
-                    "user_id": ctx.author.id,
-                    "message_id": ctx.message.id,
-                    "pokemon": json.dumps(pokemonspawn),
-                },
-            )
+            await self.insert_pokemon(ctx.author.id, ctx.message.id, pokemonspawn)
             await ctx.send(msg)
             return
         await ctx.send(_("No pokemon is ready to be caught."))
@@ -562,6 +667,24 @@ class Pokecord(
         await channel.send(embed=embed, file=_file)
         await self.config.channel(channel).pokemon.set(pokemon)
 
+    async def get_levelling_pokemon(self, user_id: int, pokeid: int) -> Optional[list]:
+        """Get `[pokemon, message_id]` for the pokemon that gets a user's xp.
+
+        This is the selected pokemon, or the first one below level 100 if that one is maxed."""
+        levelling = await self.get_pokemon_at(user_id, pokeid)
+        if levelling is None:
+            levelling = await self.get_pokemon_at(user_id, 1)
+            if levelling is None:
+                return None
+        if levelling[0]["level"] < 100:
+            return levelling
+        row = await self.cursor.fetch_one(
+            query=SELECT_FIRST_POKEMON_BELOW_LEVEL, values={"user_id": user_id, "level": 100}
+        )
+        if row is None:
+            return None
+        return [row_to_pokemon(row), row[0]]
+
     def calc_xp(self, lvl):
         return 25 * lvl
 
@@ -572,156 +695,137 @@ class Pokecord(
             return
         if datetime.datetime.utcnow().timestamp() - userconf["timestamp"] < 10:
             return
-        self.usercache[user.id][
-            "timestamp"
-        ] = datetime.datetime.utcnow().timestamp()  # Try remove a race condition
-        await self.config.user(user).timestamp.set(
-            datetime.datetime.utcnow().timestamp()
-        )  # TODO: guild based
-        await self.update_user_cache()
-        result = await self.cursor.fetch_all(query=SELECT_POKEMON, values={"user_id": user.id})
-        pokemons = []
-        for data in result:
-            pokemons.append([json.loads(data[0]), data[1]])
-        if not pokemons:
-            return
-        index = userconf["pokeid"] - 1
-        pokemon = None
-        if userconf["pokeid"] > len(pokemons):
-            index = 0
-        if pokemons[index][0]["level"] < 100:
-            pokemon = pokemons[index][0]
-            msg_id = pokemons[index][1]
-        else:
-            for i, poke in enumerate(pokemons):
-                if poke[0]["level"] < 100:
-                    pokemon = poke[0]
-                    msg_id = poke[1]
-                    break
-        if pokemon is None:
-            return  # No pokemon available to lvl up
+        # the cooldown only needs to live in memory, xp is cheap enough to lose on a restart
+        userconf["timestamp"] = datetime.datetime.utcnow().timestamp()
+        levelling = self.xp_buffer.get(user.id)
+        if levelling is None:
+            levelling = await self.get_levelling_pokemon(user.id, userconf["pokeid"])
+            if levelling is None:
+                return  # No pokemon available to lvl up
+            self.xp_buffer.set(user.id, levelling)
+        pokemon, msg_id = levelling
         xp = random.randint(5, 25) + (pokemon["level"] // 2)
         pokemon["xp"] += xp
+        if pokemon["xp"] < self.calc_xp(pokemon["level"]):
+            self.xp_buffer.mark_dirty(user.id)
+            return
+        # levelling up is written right away, it changes more than the xp
+        self.xp_buffer.discard(user.id)
         embed = None
-        if pokemon["xp"] >= self.calc_xp(pokemon["level"]):
-            pokemon["level"] += 1
+        pokemon["level"] += 1
+        pokemon["xp"] = 0
+        if isinstance(pokemon["name"], str):
+            pokename = pokemon["name"]
+        else:
+            pokename = pokemon["name"]["english"]
+        evolve = self.evolvedata.get(pokename)
+        name = (
+            self.get_name(pokemon["name"], user)
+            if pokemon.get("nickname") is None
+            else f'"{pokemon.get("nickname")}"'
+        )
+        if evolve is not None and (pokemon["level"] >= int(evolve["level"])):
+            lvl = pokemon["level"]
+            nick = pokemon.get("nickname")
+            ivs = pokemon["ivs"]
+            gender = pokemon.get("gender")
+            if gender is None:
+                gender = self.gender_choose(pokemon["name"]["english"])
+            if ivs is None:
+                ivs = {
+                    "HP": random.randint(0, 31),
+                    "Attack": random.randint(0, 31),
+                    "Defence": random.randint(0, 31),
+                    "Sp. Atk": random.randint(0, 31),
+                    "Sp. Def": random.randint(0, 31),
+                    "Speed": random.randint(0, 31),
+                }
+            stats = pokemon["stats"]
+            pokemon = self.dex_by_name.get((evolve["evolution"], pokemon.get("variant")))
+            if pokemon is None:
+                # log.debug(
+                #     f"Error occured trying to find {evolve['evolution']} for an evolution."
+                # )
+                return
+            pokemon = copy.deepcopy(pokemon)
+            if nick is not None:
+                pokemon["nickname"] = nick
             pokemon["xp"] = 0
-            if isinstance(pokemon["name"], str):
-                pokename = pokemon["name"]
-            else:
-                pokename = pokemon["name"]["english"]
-            evolve = self.evolvedata.get(pokename)
-            name = (
-                self.get_name(pokemon["name"], user)
-                if pokemon.get("nickname") is None
-                else f'"{pokemon.get("nickname")}"'
-            )
-            if evolve is not None and (pokemon["level"] >= int(evolve["level"])):
-                lvl = pokemon["level"]
-                nick = pokemon.get("nickname")
-                ivs = pokemon["ivs"]
-                gender = pokemon.get("gender")
-                if gender is None:
-                    gender = self.gender_choose(pokemon["name"]["english"])
-                if ivs is None:
-                    ivs = {
-                        "HP": random.randint(0, 31),
-                        "Attack": random.randint(0, 31),
-                        "Defence": random.randint(0, 31),
-                        "Sp. Atk": random.randint(0, 31),
-                        "Sp. Def": random.randint(0, 31),
-                        "Speed": random.randint(0, 31),
-                    }
-                stats = pokemon["stats"]
-                if pokemon.get("variant", None) is not None:
-                    pokemon = next(
-                        (
-                            item
-                            for item in self.pokemondata
-                            if (item["name"]["english"] == evolve["evolution"])
-                            and item.get("variant", "") == pokemon.get("variant", "")
-                        ),
-                        None,
-                    )
+            pokemon["level"] = lvl
+            pokemon["ivs"] = ivs
+            pokemon["gender"] = gender
+            pokemon["stats"] = stats
+            if not userconf["silence"]:
+                embed = discord.Embed(
+                    title=_("Congratulations {user}!").format(user=user.display_name),
+                    description=_("Your {name} has evolved into {evolvename}!").format(
+                        name=name, evolvename=self.get_name(pokemon["name"], user)
+                    ),
+                    color=await self.bot.get_embed_color(channel),
+                )
+            log.debug(f"{name} has evolved into {pokemon['name']} for {user}.")
+            async with self.config.user(user).pokeids() as poke:
+                if str(pokemon["id"]) not in poke:
+                    poke[str(pokemon["id"])] = 1
                 else:
-                    pokemon = next(
-                        (
-                            item
-                            for item in self.pokemondata
-                            if (item["name"]["english"] == evolve["evolution"])
-                        ),
-                        None,
-                    )  # Make better
-                if pokemon is None:
-                    # log.debug(
-                    #     f"Error occured trying to find {evolve['evolution']} for an evolution."
-                    # )
-                    return
-                if nick is not None:
-                    pokemon["nickname"] = nick
-                pokemon["xp"] = 0
-                pokemon["level"] = lvl
-                pokemon["ivs"] = ivs
-                pokemon["gender"] = gender
-                pokemon["stats"] = stats
-                if not userconf["silence"]:
-                    embed = discord.Embed(
-                        title=_("Congratulations {user}!").format(user=user.display_name),
-                        description=_("Your {name} has evolved into {evolvename}!").format(
-                            name=name, evolvename=self.get_name(pokemon["name"], user)
-                        ),
-                        color=await self.bot.get_embed_color(channel),
-                    )
-                log.debug(f"{name} has evolved into {pokemon['name']} for {user}.")
-                async with self.config.user(user).pokeids() as poke:
-                    if str(pokemon["id"]) not in poke:
-                        poke[str(pokemon["id"])] = 1
-                    else:
-                        poke[str(pokemon["id"])] += 1
+                    poke[str(pokemon["id"])] += 1
+        else:
+            log.debug(f"{pokemon['name']} levelled up for {user}")
+            for stat in pokemon["stats"]:
+                pokemon["stats"][stat] = int(pokemon["stats"][stat]) + random.randint(1, 3)
+            if not userconf["silence"]:
+                embed = discord.Embed(
+                    title=_("Congratulations {user}!").format(user=user.display_name),
+                    description=_("Your {name} has levelled up to level {level}!").format(
+                        name=name, level=pokemon["level"]
+                    ),
+                    color=await self.bot.get_embed_color(channel),
+                )
+        if embed is not None:
+            if (
+                self.guildcache[channel.guild.id].get("levelup_messages")
+                and channel.id in self.guildcache[channel.guild.id]["activechannels"]
+            ):
+                channel = channel
+            elif (
+                self.guildcache[channel.guild.id].get("levelup_messages")
+                and not self.guildcache[channel.guild.id]["activechannels"]
+            ):
+                channel = channel
             else:
-                log.debug(f"{pokemon['name']} levelled up for {user}")
-                for stat in pokemon["stats"]:
-                    pokemon["stats"][stat] = int(pokemon["stats"][stat]) + random.randint(1, 3)
-                if not userconf["silence"]:
-                    embed = discord.Embed(
-                        title=_("Congratulations {user}!").format(user=user.display_name),
-                        description=_("Your {name} has levelled up to level {level}!").format(
-                            name=name, level=pokemon["level"]
-                        ),
-                        color=await self.bot.get_embed_color(channel),
-                    )
-            if embed is not None:
-                if (
-                    self.guildcache[channel.guild.id].get("levelup_messages")
-                    and channel.id in self.guildcache[channel.guild.id]["activechannels"]
-                ):
-                    channel = channel
-                elif (
-                    self.guildcache[channel.guild.id].get("levelup_messages")
-                    and not self.guildcache[channel.guild.id]["activechannels"]
-                ):
-                    channel = channel
-                else:
-                    channel = None
-                if channel is not None:
-                    await channel.send(embed=embed)
-        # data = (user.id, msg_id, json.dumps(pokemon))
-        await self.cursor.execute(
-            query=UPDATE_POKEMON,
-            values={"user_id": user.id, "message_id": msg_id, "pokemon": json.dumps(pokemon)},
-        )
-        # task = functools.partial(self.safe_write, UPDATE_POKEMON, data)
-        # await self.bot.loop.run_in_executor(self._executor, task)
+                channel = None
+            if channel is not None:
+                await channel.send(embed=embed)
+        await self.update_pokemon(user.id, msg_id, pokemon)
+
+    def simulate_spawns(self, amount: int):
+        """Pick `amount` spawns.
+
+        Returns the amount of spawns of each variant and how many seconds picking took."""
+        choose = self.spawn_sampler.choice
+        start = time.perf_counter()
+        spawns = [choose() for __ in range(amount)]
+        elapsed = time.perf_counter() - start
+        return collections.Counter(x.get("variant", "Normal") for x in spawns), elapsed
 
     @commands.command(hidden=True)
     async def pokesim(self, ctx, amount: int = 1000000):
-        """Sim pokemon spawning - This is blocking."""
-        a = {}
-        for _ in range(amount):
-            pokemon = self.pokemon_choose()
-            variant = pokemon.get("variant", "Normal")
-            if variant not in a:
-                a[variant] = 1
-            else:
-                a[variant] += 1
-        await ctx.send(a)
+        """Sim pokemon spawning and time the spawn sampler."""
+        if amount <= 0:
+            return await ctx.send("The amount must be greater than 0!")
+        async with ctx.typing():
+            counts, elapsed = await self.bot.loop.run_in_executor(
+                None, self.simulate_spawns, amount
+            )
+        total = sum(x["spawnchance"] for x in self.pokemondata)
+        expected = collections.Counter()
+        for pokemon in self.pokemondata:
+            expected[pokemon.get("variant", "Normal")] += pokemon["spawnchance"] / total
+        table = [
+            [variant, counts[variant], f"{counts[variant] / amount:.3%}", f"{chance:.3%}"]
+            for variant, chance in expected.most_common()
+        ]
+        await ctx.send(
+            box(tabulate.tabulate(table, headers=["Variant", "Spawns", "Share", "Expected"]))
+            + f"{amount} spawns in {elapsed:.2f}s, {elapsed / amount * 1e9:.0f}ns per spawn."
+        )
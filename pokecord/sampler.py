@@ -0,0 +1,48 @@
+import random
+from typing import Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    """
+    Picks items by fixed weights in constant time, using Vose's alias method.
+
+    The tables are built once in linear time, every pick after that takes a single
+    random number, no matter how many items there are.
+    """
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if len(items) != len(weights):
+            raise ValueError("items and weights must have the same length")
+        if not items:
+            raise ValueError("can't sample from no items")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("weights must add up to more than 0")
+        size = len(items)
+        scaled = [weight * size / total for weight in weights]
+        self._items: List[T] = list(items)
+        self._size = size
+        self._probability: List[float] = [1.0] * size
+        self._alias: List[int] = list(range(size))
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probability[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # whatever is left is 1 give or take float rounding
+
+    def __len__(self):
+        return self._size
+
+    def choice(self) -> T:
+        """Pick an item."""
+        column = random.random() * self._size
+        index = int(column)
+        if column - index < self._probability[index]:
+            return self._items[index]
+        return self._items[self._alias[index]]
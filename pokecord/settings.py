@@ -34,11 +34,11 @@ class SettingsMixin(MixinMeta):
         if _type is None:
             _type = not await conf.silence()
         await conf.silence.set(_type)
+        await self.usercache.apply(ctx.author.id, "silence", _type)
         if _type:
             await ctx.send(_("Your pokécord levelling messages have been silenced."))
         else:
             await ctx.send(_("Your pokécord levelling messages have been re-enabled!"))
-        await self.update_user_cache()
 
     @poke.command()
     @commands.guild_only()
@@ -53,8 +53,8 @@ class SettingsMixin(MixinMeta):
             return
         conf = await self.user_is_global(ctx.author)
         await conf.locale.set(LOCALES[locale.lower()])
+        await self.usercache.apply(ctx.author.id, "locale", LOCALES[locale.lower()])
         await ctx.tick()
-        await self.update_user_cache()
 
     @poke.group(name="set")
     @commands.admin_or_permissions(manage_channels=True)
@@ -68,12 +68,11 @@ class SettingsMixin(MixinMeta):
         """Toggle Ava's Pokemon on or off."""
         if _type is None:
             _type = not await self.config.guild(ctx.guild).toggle()
-        await self.config.guild(ctx.guild).toggle.set(_type)
+        await self.guildcache.set(ctx.guild.id, "toggle", _type)
         if _type:
             await ctx.send(_("Ava's Pokemon has been toggled on!"))
             return
         await ctx.send(_("Ava's Pokemon has been toggled off!"))
-        await self.update_guild_cache()
 
     @pokecordset.command(usage="type")
     @commands.admin_or_permissions(manage_guild=True)
@@ -84,12 +83,11 @@ class SettingsMixin(MixinMeta):
         If no active channels are set then level up messages will send as normal."""
         if _type is None:
             _type = not await self.config.guild(ctx.guild).levelup_messages()
-        await self.config.guild(ctx.guild).levelup_messages.set(_type)
+        await self.guildcache.set(ctx.guild.id, "levelup_messages", _type)
         if _type:
             await ctx.send(_("Pokemon levelup messages have been toggled on!"))
             return
         await ctx.send(_("Pokemon levelup messages have been toggled off!"))
-        await self.update_guild_cache()
 
     @pokecordset.command()
     @commands.admin_or_permissions(manage_channels=True)
@@ -101,7 +99,7 @@ class SettingsMixin(MixinMeta):
                 await ctx.send(_("Channel has been removed."))
             else:
                 channels.append(channel.id)
-        await self.update_guild_cache()
+        await self.guildcache.apply(ctx.guild.id, "activechannels", list(channels))
         await ctx.tick()
 
     @pokecordset.command()
@@ -114,7 +112,7 @@ class SettingsMixin(MixinMeta):
                 await ctx.send(_("Channel has been removed from the whitelist."))
             else:
                 channels.append(channel.id)
-        await self.update_guild_cache()
+        await self.guildcache.apply(ctx.guild.id, "whitelist", list(channels))
         await ctx.tick()
 
     @pokecordset.command()
@@ -127,7 +125,7 @@ class SettingsMixin(MixinMeta):
                 await ctx.send(_("Channel has been removed from the blacklist."))
             else:
                 channels.append(channel.id)
-        await self.update_guild_cache()
+        await self.guildcache.apply(ctx.guild.id, "blacklist", list(channels))
         await ctx.tick()
 
     @pokecordset.command()
@@ -190,3 +188,15 @@ class SettingsMixin(MixinMeta):
             )
         await self.config.spawnloop.set(state)
         await ctx.tick()
+
+    @pokecordset.command()
+    @commands.is_owner()
+    async def checkpoint(self, ctx, seconds: int):
+        """Set how often the pokemon database's write-ahead log is checkpointed.
+
+        Use 0 to leave it to SQLite's automatic checkpoints."""
+        if seconds < 0:
+            return await ctx.send(_("The interval can't be negative."))
+        await self.config.checkpoint_interval.set(seconds)
+        self.writer.checkpoint_interval = seconds
+        await ctx.tick()
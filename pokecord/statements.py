@@ -1,32 +1,184 @@
 POKECORD_CREATE_POKECORD_TABLE = """
-CREATE TABLE IF NOT EXISTS users (
+CREATE TABLE IF NOT EXISTS pokemon (
     user_id INTEGER NOT NULL,
     message_id INTEGER NOT NULL UNIQUE,
-    pokemon JSON,
+    ordinal INTEGER NOT NULL,
+    species_id INTEGER NOT NULL,
+    level INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    variant TEXT,
+    gender TEXT,
+    iv_total INTEGER,
+    nickname TEXT,
+    data JSON,
     PRIMARY KEY (user_id, message_id)
     );
 """
+POKECORD_CREATE_ORDINAL_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS pokemon_user_ordinal ON pokemon (user_id, ordinal);
+"""
 PRAGMA_journal_mode = """
 PRAGMA journal_mode = wal;
 """
 PRAGMA_wal_autocheckpoint = """
 PRAGMA wal_autocheckpoint;
 """
+PRAGMA_wal_checkpoint = """
+PRAGMA wal_checkpoint(PASSIVE);
+"""
 PRAGMA_read_uncommitted = """
 PRAGMA read_uncommitted = 1;
 """
 
+# Every column but user_id, in the order `row_to_pokemon` expects.
+POKEMON_COLUMNS = """
+message_id, ordinal, species_id, level, xp, variant, gender, iv_total, nickname, data
+"""
+
+# The new pokemon goes at the end of the user's listing.
 INSERT_POKEMON = """
-INSERT INTO users (user_id, message_id, pokemon)
-VALUES (:user_id, :message_id, :pokemon);
+INSERT INTO pokemon (
+    user_id, message_id, ordinal, species_id, level, xp, variant, gender, iv_total, nickname, data
+)
+VALUES (
+    :user_id,
+    :message_id,
+    (SELECT COALESCE(MAX(ordinal), 0) + 1 FROM pokemon WHERE user_id = :user_id),
+    :species_id,
+    :level,
+    :xp,
+    :variant,
+    :gender,
+    :iv_total,
+    :nickname,
+    :data
+);
 """
 
-SELECT_POKEMON = """
-SELECT pokemon, message_id from users where user_id = :user_id
+SELECT_POKEMON_BY_ORDINAL = f"""
+SELECT {POKEMON_COLUMNS} FROM pokemon
+WHERE user_id = :user_id AND ordinal = :ordinal;
+"""
+
+SELECT_FIRST_POKEMON_BELOW_LEVEL = f"""
+SELECT {POKEMON_COLUMNS} FROM pokemon
+WHERE user_id = :user_id AND level < :level
+ORDER BY ordinal
+LIMIT 1;
+"""
+
+# psearch filters, used with SEARCH_POKEMON and COUNT_SEARCH_POKEMON.
+# :names is a JSON array of english names.
+SEARCH_BY_NAME = "json_extract(data, '$.name.english') IN (SELECT value FROM json_each(:names))"
+SEARCH_BY_LEVEL = "level = :level"
+SEARCH_BY_ID = "species_id = :id"
+SEARCH_BY_VARIANT = "lower(COALESCE(variant, 'None')) = :variant"
+SEARCH_BY_IV = "iv_total = :iv"
+# the first word of the gender, e.g. "male" for "Male ♂️"
+SEARCH_BY_GENDER = """
+lower(substr(
+    COALESCE(gender, 'No Gender'), 1, instr(COALESCE(gender, 'No Gender') || ' ', ' ') - 1
+)) = :gender
+"""
+SEARCH_BY_TYPE = """
+EXISTS (SELECT 1 FROM json_each(data, '$.type') WHERE lower(json_each.value) = :type)
+"""
+
+SEARCH_POKEMON = f"""
+SELECT {POKEMON_COLUMNS} FROM pokemon
+WHERE user_id = :user_id AND ({{search}})
+ORDER BY ordinal
+LIMIT :limit OFFSET :offset;
+"""
+
+COUNT_SEARCH_POKEMON = """
+SELECT COUNT(*) FROM pokemon WHERE user_id = :user_id AND ({search});
+"""
+
+COUNT_POKEMON = """
+SELECT COUNT(*) FROM pokemon WHERE user_id = :user_id;
 """
 
 UPDATE_POKEMON = """
+UPDATE pokemon
+SET species_id = :species_id,
+    level = :level,
+    xp = :xp,
+    variant = :variant,
+    gender = :gender,
+    iv_total = :iv_total,
+    nickname = :nickname,
+    data = :data
+WHERE message_id = :message_id AND user_id = :user_id;
+"""
+
+UPDATE_XP = """
+UPDATE pokemon
+SET xp = :xp
+WHERE message_id = :message_id AND user_id = :user_id;
+"""
+
+UPDATE_NICKNAME = """
+UPDATE pokemon
+SET nickname = :nickname
+WHERE message_id = :message_id AND user_id = :user_id;
+"""
+
+DELETE_POKEMON = """
+DELETE FROM pokemon WHERE message_id = :message_id AND user_id = :user_id;
+"""
+
+# Run after DELETE_POKEMON so the listing has no gaps.
+# Ordinals are moved out of the way first, the unique index is checked per row.
+SHIFT_ORDINALS_OUT = """
+UPDATE pokemon
+SET ordinal = -ordinal
+WHERE user_id = :user_id AND ordinal > :ordinal;
+"""
+SHIFT_ORDINALS_DOWN = """
+UPDATE pokemon
+SET ordinal = -ordinal - 1
+WHERE user_id = :user_id AND ordinal < 0;
+"""
+
+# Schema migration from the single `users` table holding the whole pokemon as JSON.
+SELECT_LEGACY_TABLE = """
+SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'users';
+"""
+
+SELECT_LEGACY_POKEMON = """
+SELECT pokemon, message_id from users where user_id = :user_id
+"""
+
+UPDATE_LEGACY_POKEMON = """
 UPDATE users
 SET pokemon = :pokemon
 where message_id = :message_id and user_id = :user_id;
 """
+
+SELECT_ALL_LEGACY_POKEMON = """
+SELECT user_id, message_id, pokemon FROM users ORDER BY user_id, message_id;
+"""
+
+INSERT_MIGRATED_POKEMON = """
+INSERT OR IGNORE INTO pokemon (
+    user_id, message_id, ordinal, species_id, level, xp, variant, gender, iv_total, nickname, data
+)
+VALUES (
+    :user_id,
+    :message_id,
+    :ordinal,
+    :species_id,
+    :level,
+    :xp,
+    :variant,
+    :gender,
+    :iv_total,
+    :nickname,
+    :data
+);
+"""
+
+RENAME_LEGACY_TABLE = """
+ALTER TABLE users RENAME TO users_legacy;
+"""
@@ -1,5 +1,4 @@
 import asyncio
-import json
 
 import discord
 import tabulate
@@ -26,19 +25,13 @@ class TradeMixin(MixinMeta):
 
         Currently a work in progress."""
         async with ctx.typing():
-            result = await self.cursor.fetch_all(
-                query="""SELECT pokemon, message_id from users where user_id = :user_id""",
-                values={"user_id": ctx.author.id},
-            )
-            pokemons = [None]
-            for data in result:
-                pokemons.append([json.loads(data[0]), data[1]])
+            amount = await self.count_pokemon(ctx.author.id)
+            pokemon = await self.get_pokemon_at(ctx.author.id, id) if amount else None
 
-        if not pokemons:
+        if not amount:
             return await ctx.send(_("You don't have any pokémon, trainer!"))
-        if id >= len(pokemons):
+        if pokemon is None:
             return await ctx.send(_("You don't have a pokemon at that slot."))
-        pokemon = pokemons[id]
         name = self.get_name(pokemon[0]["name"], ctx.author)
 
         await ctx.send(
@@ -94,17 +87,8 @@ class TradeMixin(MixinMeta):
                 return
 
             if authorconfirm.result:
-                await self.cursor.execute(
-                    query="DELETE FROM users where message_id = :message_id",
-                    values={"message_id": pokemon[1]},
-                )
-                await self.cursor.execute(
-                    query=INSERT_POKEMON,
-                    values={
-                        "user_id": user.id,
-                        "message_id": ctx.message.id,
-                        "pokemon": json.dumps(pokemon[0]),
-                    },
+                await self.move_pokemon(
+                    ctx.author.id, pokemon[1], id, pokemon[0], user.id, ctx.message.id
                 )
                 userconf = await self.user_is_global(ctx.author)
                 pokeid = await userconf.pokeid()
@@ -114,11 +98,13 @@ class TradeMixin(MixinMeta):
                         "{user}, your default pokemon may have changed. I have tried to account for this change."
                     ).format(user=ctx.author)
                     await userconf.pokeid.set(pokeid - 1)
+                    await self.usercache.apply(ctx.author.id, "pokeid", pokeid - 1)
                 elif id == pokeid:
                     msg += _(
                         "{user}, You have traded your selected pokemon. I have reset your selected pokemon to your first pokemon."
                     ).format(user=user)
                     await userconf.pokeid.set(1)
+                    await self.usercache.apply(ctx.author.id, "pokeid", 1)
 
                 await bank.withdraw_credits(user, bal)
                 try:
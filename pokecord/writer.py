@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from databases import Database
+
+from .statements import PRAGMA_wal_checkpoint
+
+log = logging.getLogger("red.flare.pokecord.writer")
+
+Statement = Tuple[str, dict]
+
+
+class DatabaseWriter:
+    """
+    Single task doing every write to the pokemon database.
+
+    Writes are queued as intents, lists of statements that must be committed together.
+    The task commits whatever is queued in one transaction, after waiting up to
+    `BATCH_DELAY` seconds for `BATCH_SIZE` statements to pile up, so a burst of writes
+    costs a handful of commits instead of one commit per statement.
+    """
+
+    BATCH_DELAY = 0.05
+    BATCH_SIZE = 500
+
+    def __init__(self, cursor: Database):
+        self._cursor = cursor
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # seconds between `PRAGMA wal_checkpoint` runs, 0 to leave it to sqlite
+        self.checkpoint_interval: float = 0
+        self._last_checkpoint = time.monotonic()
+        self.commits = 0
+        self.statements = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, *statements: Statement):
+        """Queue statements to be committed together and wait until they are."""
+        await self.submit(*statements)
+
+    def submit(self, *statements: Statement) -> asyncio.Future:
+        """Queue statements to be committed together without waiting for them.
+
+        The returned future is done once they are committed."""
+        future = asyncio.get_running_loop().create_future()
+        if statements:
+            self._queue.put_nowait((list(statements), future))
+        else:
+            future.set_result(None)
+        return future
+
+    async def flush(self):
+        """Wait until everything queued so far is committed."""
+        await self.submit(("SELECT 1;", {}))
+
+    async def close(self):
+        """Commit everything that's queued and stop the task."""
+        if self._task is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._task.cancel()
+            self._task = None
+
+    async def _next_batch(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = asyncio.get_running_loop().time() + self.BATCH_DELAY
+        while size < self.BATCH_SIZE:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                intent = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(intent)
+            size += len(intent[0])
+        return batch
+
+    async def _commit(self, intents: List[tuple]):
+        async with self._cursor.transaction():
+            for statements, __ in intents:
+                for query, values in statements:
+                    await self._cursor.execute(query=query, values=values)
+        self.commits += 1
+        self.statements += sum(len(statements) for statements, __ in intents)
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._commit(batch)
+            except Exception:
+                # find the failing intents, without failing the rest with them
+                for intent in batch:
+                    try:
+                        await self._commit([intent])
+                    except Exception as exc:
+                        log.error("Exception writing to the pokemon database: ", exc_info=exc)
+                        if not intent[1].done():
+                            intent[1].set_exception(exc)
+                    else:
+                        if not intent[1].done():
+                            intent[1].set_result(None)
+            else:
+                for __, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            if (
+                self.checkpoint_interval
+                and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+            ):
+                self._last_checkpoint = time.monotonic()
+                try:
+                    await self._cursor.execute(PRAGMA_wal_checkpoint)
+                except Exception as exc:
+                    log.error("Exception checkpointing the pokemon database: ", exc_info=exc)
@@ -1,7 +1,7 @@
 import asyncio
 import random
 from .buttons import SwapPromptView
-from .data import generate_main_battle_message, generate_text_battle_message, find
+from .data import generate_main_battle_message, generate_text_battle_message, get_battle_tables
 from .enums import Ability, DamageClass
 from .misc import ExpiringEffect, Weather, Terrain
 
@@ -31,35 +31,17 @@ class Battle():
         self.plasma_fists = False
         self.turn = 0
         self.last_move_effect = None
-        self.metronome_moves_raw = []
+        # Shared between all battles, never modify these
+        tables = get_battle_tables(ctx.cog)
+        self.metronome_moves_raw = tables.metronome_moves
         #(AttackerType, DefenderType): Effectiveness
-        self.type_effectiveness = {}
+        self.type_effectiveness = tables.type_effectiveness
         self.inverse_battle = inverse_battle
         self.msg = ""
 
     async def run(self):
         """Runs the duel."""
         self.msg = ""
-        # Moves which are immune to metronome
-        immune_ids = [
-            68, 102, 119, 144, 165, 166, 168, 173, 182, 194, 197, 203, 214, 243, 264, 266,
-            267, 270, 271, 274, 289, 343, 364, 382, 383, 415, 448, 469, 476, 495, 501, 511,
-            516, 546, 547, 548, 553, 554, 555, 557, 561, 562, 578, 588, 591, 592, 593, 596,
-            606, 607, 614, 615, 617, 621, 661, 671, 689, 690, 704, 705, 712, 720, 721, 722
-        ]
-        # Moves which are not coded in the bot
-        uncoded_ids = [
-            266, 270, 476, 495, 502, 511, 597, 602, 603, 607, 622, 623, 624, 625, 626, 627,
-            628, 629, 630, 631, 632, 633, 634, 635, 636, 637, 638, 639, 640, 641, 642, 643,
-            644, 645, 646, 647, 648, 649, 650, 651, 652, 653, 654, 655, 656, 657, 658, 671,
-            695, 696, 697, 698, 699, 700, 701, 702, 703, 719, 723, 724, 725, 726, 727, 728,
-            811, 10001, 10002, 10003, 10004, 10005, 10006, 10007, 10008, 10009, 10010, 10011,
-            10012, 10013, 10014, 10015, 10016, 10017, 10018
-        ]
-        ignored_ids = list(set(immune_ids) | set(uncoded_ids))
-        self.metronome_moves_raw = await find(self.ctx, "moves", {"id": {"$nin": ignored_ids}})
-        for te in await find(self.ctx, "type_effectiveness", {}):
-            self.type_effectiveness[(te["damage_type_id"], te["target_type_id"])] = te["damage_factor"]
         #This calculation only uses the primative speed attr as the pokes have not been fully initiaized yet.
         if self.trainer1.current_pokemon.get_raw_speed() > self.trainer2.current_pokemon.get_raw_speed():
             self.msg += self.trainer1.current_pokemon.send_out(self.trainer2.current_pokemon, self)
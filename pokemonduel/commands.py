@@ -7,7 +7,7 @@ import logging
 from .battle import Battle
 from .buttons import DuelAcceptView
 from .pokemon import DuelPokemon
-from .data import generate_team_preview, find, find_one
+from .data import generate_team_preview, find, find_one, get_battle_tables
 from .trainer import MemberTrainer, NPCTrainer
 
 
@@ -30,6 +30,10 @@ class PokemonDuel(commands.Cog):
             useThreads = False,
         )
 
+    async def cog_load(self):
+        """Build the tables shared by all battles, so starting a duel doesn't have to."""
+        await asyncio.to_thread(get_battle_tables, self)
+
     @staticmethod
     async def party_from_teambuilder(ctx, teambuilder):
         """
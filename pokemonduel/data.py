@@ -1,30 +1,140 @@
 import discord
 from redbot.core.data_manager import bundled_data_path
+import copy
 import json
+from types import MappingProxyType
 from .buttons import BattlePromptView, PreviewPromptView
 
 
-async def find(ctx, db, filter):
-    """Fetch all matching rows from a data file."""
-    path = str(bundled_data_path(ctx.cog) / db) + ".json"
-    with open(path) as f:
-        data = json.load(f)
-    results = []
-    for item in data:
-        success = True
+class DataFile():
+    """
+    A bundled data file, parsed once and shared by every caller in the process.
+
+    Hash indexes are built the first time a key is queried by equality.
+    """
+    def __init__(self, path):
+        with open(path) as f:
+            self.rows = json.load(f)
+        self.indexes = {}
+
+    def index(self, key):
+        """Returns a dict of value -> rows for `key`, or None if the values can't be hashed."""
+        if key not in self.indexes:
+            index = {}
+            try:
+                for item in self.rows:
+                    if key in item:
+                        index.setdefault(item[key], []).append(item)
+            except TypeError:
+                index = None
+            self.indexes[key] = index
+        return self.indexes[key]
+
+    def find(self, filter):
+        """Returns all rows matching the filter, without copying them."""
+        candidates = self.rows
         for key, value in filter.items():
             if isinstance(value, dict):
-                if "$nin" in value:
-                    if item[key] in value["$nin"]:
+                continue
+            index = self.index(key)
+            if index is not None:
+                try:
+                    candidates = index.get(value, [])
+                except TypeError:
+                    continue
+                break
+        results = []
+        for item in candidates:
+            success = True
+            for key, value in filter.items():
+                if isinstance(value, dict):
+                    if "$nin" in value:
+                        if item[key] in value["$nin"]:
+                            success = False
+                            break
+                else:
+                    if item[key] != value:
                         success = False
                         break
-            else:
-                if item[key] != value:
-                    success = False
-                    break
-        if success:
-            results.append(item)
-    return results
+            if success:
+                results.append(item)
+        return results
+
+_data_files = {}
+
+def get_data_file(cog, db):
+    """Returns the shared DataFile for `db`, loading it on first use."""
+    path = str(bundled_data_path(cog) / db) + ".json"
+    if path not in _data_files:
+        _data_files[path] = DataFile(path)
+    return _data_files[path]
+
+
+# Moves which are immune to metronome
+METRONOME_IMMUNE_IDS = frozenset([
+    68, 102, 119, 144, 165, 166, 168, 173, 182, 194, 197, 203, 214, 243, 264, 266,
+    267, 270, 271, 274, 289, 343, 364, 382, 383, 415, 448, 469, 476, 495, 501, 511,
+    516, 546, 547, 548, 553, 554, 555, 557, 561, 562, 578, 588, 591, 592, 593, 596,
+    606, 607, 614, 615, 617, 621, 661, 671, 689, 690, 704, 705, 712, 720, 721, 722
+])
+# Moves which are not coded in the bot
+UNCODED_MOVE_IDS = frozenset([
+    266, 270, 476, 495, 502, 511, 597, 602, 603, 607, 622, 623, 624, 625, 626, 627,
+    628, 629, 630, 631, 632, 633, 634, 635, 636, 637, 638, 639, 640, 641, 642, 643,
+    644, 645, 646, 647, 648, 649, 650, 651, 652, 653, 654, 655, 656, 657, 658, 671,
+    695, 696, 697, 698, 699, 700, 701, 702, 703, 719, 723, 724, 725, 726, 727, 728,
+    811, 10001, 10002, 10003, 10004, 10005, 10006, 10007, 10008, 10009, 10010, 10011,
+    10012, 10013, 10014, 10015, 10016, 10017, 10018
+])
+
+class TypeChart():
+    """
+    Type effectiveness as a dense matrix, indexed like a dict with (attacker type id, defender type id).
+    
+    Type ids are mapped to matrix rows/columns, as they are not contiguous.
+    """
+    def __init__(self, rows):
+        type_ids = sorted({r["damage_type_id"] for r in rows} | {r["target_type_id"] for r in rows})
+        self._index = {type_id: i for i, type_id in enumerate(type_ids)}
+        matrix = [[None] * len(type_ids) for _ in type_ids]
+        for r in rows:
+            matrix[self._index[r["damage_type_id"]]][self._index[r["target_type_id"]]] = r["damage_factor"]
+        self._matrix = tuple(tuple(row) for row in matrix)
+
+    def __getitem__(self, key):
+        attacker, defender = key
+        try:
+            factor = self._matrix[self._index[attacker]][self._index[defender]]
+        except KeyError:
+            raise KeyError(key) from None
+        if factor is None:
+            raise KeyError(key)
+        return factor
+
+class BattleTables():
+    """Read-only tables used by every battle, built once per process."""
+    def __init__(self, cog):
+        self.type_effectiveness = TypeChart(get_data_file(cog, "type_effectiveness").rows)
+        ignored_ids = METRONOME_IMMUNE_IDS | UNCODED_MOVE_IDS
+        self.metronome_moves = tuple(
+            MappingProxyType(dict(move))
+            for move in get_data_file(cog, "moves").rows
+            if move["id"] not in ignored_ids
+        )
+
+_battle_tables = {}
+
+def get_battle_tables(cog):
+    """Returns the shared BattleTables, building them on first use."""
+    path = str(bundled_data_path(cog))
+    if path not in _battle_tables:
+        _battle_tables[path] = BattleTables(cog)
+    return _battle_tables[path]
+
+async def find(ctx, db, filter):
+    """Fetch all matching rows from a data file."""
+    # Callers are free to modify what they get back, so hand out copies of the shared rows.
+    return copy.deepcopy(get_data_file(ctx.cog, db).find(filter))
 
 async def find_one(ctx, db, filter):
     """Fetch the first matching row from a data file."""
@@ -0,0 +1,166 @@
+import hashlib
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from redbot.core import Config
+
+
+class EntryFingerprints:
+    """
+    Bounded set of fingerprints of the entries seen in a feed.
+
+    Fingerprints are kept in least recently seen order. When the set is full, the
+    fingerprint that has been gone from the feed the longest is evicted first.
+    """
+
+    MAX_SIZE = 100
+
+    def __init__(self, fingerprints: Iterable[str] = ()):
+        self._fingerprints = OrderedDict.fromkeys(fingerprints)
+
+    def __contains__(self, fingerprint: str):
+        return fingerprint in self._fingerprints
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    @staticmethod
+    def fingerprint(entry) -> str:
+        """Short hash of an entry's guid, or its link, or its title and time if it has neither."""
+        key = entry.get("id", None) or entry.get("link", None)
+        if not key:
+            key = f"{entry.get('title', '')}|{entry.get('updated', entry.get('published', ''))}"
+        return hashlib.blake2b(str(key).encode("utf-8"), digest_size=6).hexdigest()
+
+    def add_entries(self, entries: List) -> bool:
+        """
+        Mark entries as seen. `entries` is ordered newest first, like a sorted feed.
+
+        Returns whether a fingerprint was added or evicted.
+        """
+        changed = False
+        for entry in reversed(entries):
+            fingerprint = self.fingerprint(entry)
+            if fingerprint not in self._fingerprints:
+                changed = True
+            self._fingerprints[fingerprint] = None
+            self._fingerprints.move_to_end(fingerprint)
+        # never evict anything that is still in the feed
+        max_size = max(self.MAX_SIZE, len(entries))
+        while len(self._fingerprints) > max_size:
+            self._fingerprints.popitem(last=False)
+            changed = True
+        return changed
+
+    def to_json(self) -> List[str]:
+        return list(self._fingerprints)
+
+
+class FeedStateTable:
+    """
+    In-memory table of the last scraped state of every feed.
+
+    The table is loaded from Config once, updated in place by the feed loop
+    and written back in one batch with `flush`, which only touches the
+    channels that have changed since the last flush.
+    """
+
+    STATE_KEYS = ("last_title", "last_link", "last_time")
+
+    def __init__(self, config: Config):
+        self._config = config
+        # channel id -> feed name -> state
+        self._states: Dict[int, Dict[str, dict]] = {}
+        # channel id -> feed name -> fingerprints of the entries seen in the feed
+        self._fingerprints: Dict[int, Dict[str, EntryFingerprints]] = {}
+        # channel id -> names of the feeds changed since the last flush
+        self._dirty: Dict[int, Set[str]] = defaultdict(set)
+        self.loaded: bool = False
+        self.writes: int = 0
+
+    async def load(self):
+        """Load the state of every feed from Config, if that wasn't done yet."""
+        if self.loaded:
+            return
+        all_channels = await self._config.all_channels()
+        for channel_id, channel_data in all_channels.items():
+            channel_states = self._states.setdefault(channel_id, {})
+            channel_fingerprints = self._fingerprints.setdefault(channel_id, {})
+            for feed_name, feed_data in channel_data["feeds"].items():
+                # don't overwrite anything the feed loop changed before loading
+                if feed_name not in channel_states:
+                    channel_states[feed_name] = {
+                        key: feed_data.get(key, None) for key in self.STATE_KEYS
+                    }
+                if (
+                    feed_name not in channel_fingerprints
+                    and feed_data.get("fingerprints", None) is not None
+                ):
+                    channel_fingerprints[feed_name] = EntryFingerprints(feed_data["fingerprints"])
+        self.loaded = True
+
+    def get(self, channel_id: int, feed_name: str) -> Optional[dict]:
+        """Get the state of a feed, or None if the table doesn't know it."""
+        return self._states.get(channel_id, {}).get(feed_name, None)
+
+    def update(self, channel_id: int, feed_name: str, **state):
+        """Update the state of a feed and mark it as dirty if anything changed."""
+        current = self._states.setdefault(channel_id, {}).setdefault(feed_name, {})
+        if any(key not in current or current[key] != value for key, value in state.items()):
+            current.update(state)
+            self.mark_dirty(channel_id, feed_name)
+
+    def get_fingerprints(self, channel_id: int, feed_name: str) -> Optional[EntryFingerprints]:
+        """Get the entry fingerprints of a feed, or None if they were never recorded."""
+        return self._fingerprints.get(channel_id, {}).get(feed_name, None)
+
+    def set_fingerprints(self, channel_id: int, feed_name: str, fingerprints: EntryFingerprints):
+        """Set the entry fingerprints of a feed and mark it as dirty."""
+        self._fingerprints.setdefault(channel_id, {})[feed_name] = fingerprints
+        self.mark_dirty(channel_id, feed_name)
+
+    def discard(self, channel_id: int, feed_name: str):
+        """Forget a feed, e.g. when it's deleted, so that Config is used for it again."""
+        self._states.get(channel_id, {}).pop(feed_name, None)
+        self._fingerprints.get(channel_id, {}).pop(feed_name, None)
+        if channel_id in self._dirty:
+            self._dirty[channel_id].discard(feed_name)
+            if not self._dirty[channel_id]:
+                del self._dirty[channel_id]
+
+    def mark_dirty(self, channel_id: int, feed_name: str):
+        self._dirty[channel_id].add(feed_name)
+
+    def dirty_channels(self) -> Set[int]:
+        """Channel ids with feeds that changed since the last flush."""
+        return set(self._dirty)
+
+    async def flush(self) -> int:
+        """
+        Write the state of every dirty feed to Config, one transaction per changed channel.
+
+        Returns the amount of channels written.
+        """
+        dirty, self._dirty = self._dirty, defaultdict(set)
+        dirty_items = list(dirty.items())
+        written = 0
+        try:
+            for channel_id, feed_names in dirty_items:
+                async with self._config.channel_from_id(channel_id).feeds() as feed_data:
+                    for feed_name in feed_names:
+                        # the feed was deleted since it was last checked
+                        if feed_name not in feed_data:
+                            continue
+                        state = self.get(channel_id, feed_name)
+                        if state is not None:
+                            feed_data[feed_name].update(state)
+                        fingerprints = self.get_fingerprints(channel_id, feed_name)
+                        if fingerprints is not None:
+                            feed_data[feed_name]["fingerprints"] = fingerprints.to_json()
+                written += 1
+        finally:
+            # keep whatever wasn't written for the next flush
+            for channel_id, feed_names in dirty_items[written:]:
+                self._dirty[channel_id].update(feed_names)
+            self.writes += written
+        return written
@@ -1,15 +1,18 @@
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
-import copy
-import datetime
+import collections
+import concurrent.futures
 import discord
 import feedparser
 import filetype
 import io
 import itertools
 import logging
+import multiprocessing
+import pathlib
 import re
+import site
 import time
 import warnings
 from typing import Optional, Union
@@ -18,11 +21,14 @@ from urllib.parse import urlparse
 
 from redbot.core import checks, commands, Config
 from redbot.core.utils import can_user_send_messages_in
-from redbot.core.utils.chat_formatting import bold, box, escape, humanize_list, pagify
+from redbot.core.utils.chat_formatting import bold, box, pagify
 
 from .color import Color
+from .feed_state import EntryFingerprints, FeedStateTable
+from .parsing import append_bs4_tags, get_tag_content_type, parse_feed
 from .quiet_template import QuietTemplate
 from .rss_feed import RssFeed
+from .scheduler import FeedScheduler
 from .tag_type import INTERNAL_TAGS, VALID_IMAGES, TagType
 
 log = logging.getLogger("red.aikaterna.rss")
@@ -33,7 +39,7 @@ IPV6_RE = re.compile("([a-f0-9:]+:+)+[a-f0-9]+")
 GuildMessageable = Union[discord.TextChannel, discord.VoiceChannel, discord.StageChannel, discord.Thread]
 
 
-__version__ = "2.1.8"
+__version__ = "2.2.0"
 
 warnings.filterwarnings(
     "ignore",
@@ -57,15 +63,52 @@ class RSS(commands.Cog):
 
         self.config = Config.get_conf(self, 2761331001, force_registration=True)
         self.config.register_channel(feeds={})
-        self.config.register_global(use_published=["www.youtube.com"])
+        self.config.register_global(
+            use_published=["www.youtube.com"],
+            max_workers=10,
+            max_per_host=2,
+            parse_executor="thread",
+            parse_workers=2,
+        )
 
         self._post_queue = asyncio.PriorityQueue()
         self._post_queue_size = None
 
+        # url -> queue entries of the channel feeds subscribed to that url, reloaded every 5 minutes
+        self._subscriptions = {}
+        self._subscriptions_stale = True
+        # decides when each url is checked next based on how often it posts
+        self._scheduler = FeedScheduler()
+
+        # last scraped state of every feed, flushed to config once per feed cycle
+        self._feed_state = FeedStateTable(self.config)
+
+        # per-host bookkeeping for the feed workers, see _feed_worker
+        self._host_active = collections.Counter()
+        self._host_backlog = collections.defaultdict(collections.deque)
+        self._last_cycle_time = None
+
+        # url -> fetch task, only set while a feed cycle is running, see _fetch_feedparser_object_cached
+        self._cycle_feed_cache = None
+        self._last_cycle_urls = None
+
         self._read_feeds_loop = None
 
         self._headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0"}
 
+        # one long-lived session for every request so connections and dns lookups are reused
+        self._session = aiohttp.ClientSession(
+            headers=self._headers,
+            timeout=aiohttp.ClientTimeout(total=20),
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, enable_cleanup_closed=True),
+        )
+        # url -> ETag/Last-Modified response headers from the last full download of that feed in the feed loop
+        self._conditional_headers = {}
+        self._fetch_stats = collections.Counter()
+
+        # feedparser and bs4 work runs here instead of on the event loop, built on first use
+        self._parse_executor = None
+
     async def red_delete_data_for_user(self, **kwargs):
         """Nothing to delete"""
         return
@@ -73,25 +116,36 @@ class RSS(commands.Cog):
     def initialize(self):
         self._read_feeds_loop = self.bot.loop.create_task(self.read_feeds())
 
-    def cog_unload(self):
+    async def cog_unload(self):
         if self._read_feeds_loop:
             self._read_feeds_loop.cancel()
+        await self._feed_state.flush()
+        await self._session.close()
+        if self._parse_executor:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
 
-    def _add_content_images(self, bs4_soup: BeautifulSoup, rss_object: feedparser.util.FeedParserDict):
-        """
-        $content_images should always be marked as a special tag as the tags will
-        be dynamically generated based on the content included in the latest post.
-        """
-        content_images = bs4_soup.find_all("img")
-        if content_images:
-            for i, image in enumerate(content_images):
-                tag_name = f"content_image{str(i + 1).zfill(2)}"
-                try:
-                    rss_object[tag_name] = image["src"]
-                    rss_object["is_special"].append(tag_name)
-                except KeyError:
-                    pass
-        return rss_object
+    @staticmethod
+    def _build_parse_executor(executor_type: str, workers: int):
+        """Helper for _run_parse_job."""
+        if executor_type == "process":
+            # spawned workers need this cog's package on their path to unpickle the parse jobs
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=site.addsitedir,
+                initargs=(str(pathlib.Path(__file__).parent.parent),),
+            )
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rss_parse")
+
+    async def _run_parse_job(self, func, *args):
+        """Run a CPU-bound function from .parsing in the parse executor."""
+        if self._parse_executor is None:
+            executor_type = await self.config.parse_executor()
+            workers = await self.config.parse_workers()
+            # another job may have built the executor while we waited on config
+            if self._parse_executor is None:
+                self._parse_executor = self._build_parse_executor(executor_type, workers)
+        return await asyncio.get_running_loop().run_in_executor(self._parse_executor, func, *args)
 
     async def _add_feed(self, ctx, feed_name: str, channel: GuildMessageable, url: str):
         """Helper for rss add."""
@@ -116,6 +170,12 @@ class RSS(commands.Cog):
 
             async with self.config.channel(channel).feeds() as feed_data:
                 feed_data[feed_name] = rss_object.to_json()
+            self._feed_state.discard(channel.id, feed_name)
+            # everything in the feed right now counts as seen
+            fingerprints = EntryFingerprints()
+            fingerprints.add_entries(sorted_feed_by_post_time)
+            self._feed_state.set_fingerprints(channel.id, feed_name, fingerprints)
+            self._subscriptions_stale = True
             msg = (
                 f"Feed `{feed_name}` added in channel: {channel.mention}\n"
                 f"List the template tags with `{ctx.prefix}rss listtags` "
@@ -126,180 +186,9 @@ class RSS(commands.Cog):
             await ctx.send(f"There is already an existing feed named {bold(feed_name)} in {channel.mention}.")
             return
 
-    def _add_generic_html_plaintext(self, bs4_soup: BeautifulSoup):
-        """
-        Bs4's .text attribute on a soup strips newlines and spaces
-        This provides newlines and more readable content.
-        """
-        text = ""
-        for element in bs4_soup.descendants:
-            if isinstance(element, str):
-                text += element
-            elif element.name == "br" or element.name == "p" or element.name == "li":
-                text += "\n"
-        text = re.sub("\\n+", "\n", text)
-        text = text.replace("*", "\\*")
-        text = text.replace("SC_OFF", "").replace("SC_ON", "\n")
-        text = text.replace("[link]", "").replace("[comments]", "")
-
-        return escape(text)
-
     async def _append_bs4_tags(self, rss_object: feedparser.util.FeedParserDict, url: str):
         """Append bs4-discovered tags to an rss_feed/feedparser object."""
-        rss_object["is_special"] = []
-        soup = None
-        tags_list = []
-
-        temp_rss_obect = copy.deepcopy(rss_object)
-        for tag_name, tag_content in temp_rss_obect.items():
-            if tag_name in INTERNAL_TAGS:
-                continue
-
-            tag_content_check = await self._get_tag_content_type(tag_content)
-
-            if tag_content_check == TagType.HTML:
-                # this is a tag that is only html content
-                try:
-                    soup = BeautifulSoup(tag_content, "html.parser")
-                except TypeError:
-                    pass
-
-                # this is a standard html format summary_detail tag
-                # the tag was determined to be html through the type attrib that
-                # was attached from the feed publisher but it's really a dict.
-                try:
-                    soup = BeautifulSoup(tag_content["value"], "html.parser")
-                except (KeyError, TypeError):
-                    pass
-
-                # this is a standard html format content or summary tag
-                try:
-                    soup = BeautifulSoup(tag_content[0]["value"], "html.parser")
-                except (KeyError, TypeError):
-                    pass
-
-                if soup:
-                    rss_object[f"{tag_name}_plaintext"] = self._add_generic_html_plaintext(soup)
-
-            if tag_content_check == TagType.LIST:
-                tags_content_counter = 0
-
-                for list_item in tag_content:
-                    list_item_check = await self._get_tag_content_type(list_item)
-
-                    # for common "links" format or when "content" is a list
-                    list_html_content_counter = 0
-                    if list_item_check == TagType.HTML:
-                        list_tags = ["value", "href"]
-                        for tag in list_tags:
-                            try:
-                                url_check = await self._valid_url(list_item[tag], feed_check=False)
-                                if not url_check:
-                                    # bs4 will cry if you try to give it a url to parse, so let's only
-                                    # parse non-url content
-                                    tag_content = BeautifulSoup(list_item[tag], "html.parser")
-                                    tag_content = self._add_generic_html_plaintext(tag_content)
-                                else:
-                                    tag_content = list_item[tag]
-                                list_html_content_counter += 1
-                                name = f"{tag_name}_plaintext{str(list_html_content_counter).zfill(2)}"
-                                rss_object[name] = tag_content
-                                rss_object["is_special"].append(name)
-                            except (KeyError, TypeError):
-                                pass
-
-                    if list_item_check == TagType.DICT:
-                        authors_content_counter = 0
-                        enclosure_content_counter = 0
-                        enclosure_url_counter = 0
-
-                        # common "authors" tag format
-                        try:
-                            authors_content_counter += 1
-                            name = f"{tag_name}_plaintext{str(authors_content_counter).zfill(2)}"
-                            tag_content = BeautifulSoup(list_item["name"], "html.parser")
-                            rss_object[name] = tag_content.get_text()
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # common "enclosure" tag image format
-                        # note: this is not adhering to RSS feed specifications
-                        # proper enclosure tags should have `length`, `type`, `url`
-                        # and not `href`, `type`, `rel`
-                        # but, this is written for the first feed I have seen with an "enclosure" tag
-                        try:
-                            image_url = list_item["href"]
-                            image_type = list_item["type"]
-                            image_rel = list_item["rel"]
-                            enclosure_content_counter += 1
-                            name = f"media_plaintext{str(enclosure_content_counter).zfill(2)}"
-                            rss_object[name] = image_url
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # special tag for enclosure["url"] so that users can differentiate them
-                        # from image urls found in enclosure["href"]
-                        try:
-                            image_url = list_item["url"]
-                            enclosure_url_counter += 1
-                            name = f"media_url{str(enclosure_url_counter).zfill(2)}"
-                            rss_object[name] = image_url
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # common "tags" tag format
-                        try:
-                            tag = list_item["term"]
-                            tags_content_counter += 1
-                            name = f"{tag_name}_plaintext{str(tags_content_counter).zfill(2)}"
-                            rss_object[name] = tag
-                            rss_object["is_special"].append(name)
-                            tags_list.append(tag) if tag not in tags_list else tags_list
-                        except KeyError:
-                            pass
-
-                if len(tags_list) > 0:
-                    rss_object["tags_list"] = tags_list
-                    rss_object["tags_plaintext_list"] = humanize_list(tags_list)
-                    rss_object["is_special"].append("tags_list")
-                    rss_object["is_special"].append("tags_plaintext_list")
-
-        # if image dict tag exists, check for an image
-        try:
-            rss_object["image_plaintext"] = rss_object["image"]["href"]
-            rss_object["is_special"].append("image_plaintext")
-        except KeyError:
-            pass
-
-        # if media_thumbnail or media_content exists, return the first friendly url
-        try:
-            rss_object["media_content_plaintext"] = rss_object["media_content"][0]["url"]
-            rss_object["is_special"].append("media_content_plaintext")
-        except KeyError:
-            pass
-        try:
-            rss_object["media_thumbnail_plaintext"] = rss_object["media_thumbnail"][0]["url"]
-            rss_object["is_special"].append("media_thumbnail_plaintext")
-        except KeyError:
-            pass
-
-        # change published_parsed and updated_parsed into a datetime object for embed footers
-        for time_tag in ["updated_parsed", "published_parsed"]:
-            try:
-                if isinstance(rss_object[time_tag], time.struct_time):
-                    rss_object[f"{time_tag}_datetime"] = datetime.datetime(*rss_object[time_tag][:6])
-            except KeyError:
-                pass
-
-        if soup:
-            rss_object = self._add_content_images(soup, rss_object)
-
-        # add special tag/special site formatter here if needed in the future
-
-        return rss_object
+        return await self._run_parse_job(append_bs4_tags, rss_object)
 
     async def _check_channel_permissions(self, ctx, channel: GuildMessageable, addl_send_messages_check=True):
         """Helper for rss functions."""
@@ -343,7 +232,9 @@ class RSS(commands.Cog):
         if rss_exists:
             async with self.config.channel(channel).feeds() as rss_data:
                 rss_data.pop(feed_name, None)
-                return True
+            self._feed_state.discard(channel.id, feed_name)
+            self._subscriptions_stale = True
+            return True
         return False
 
     async def _edit_template(self, ctx, feed_name: str, channel: GuildMessageable, template: str):
@@ -407,36 +298,44 @@ class RSS(commands.Cog):
         Tag content type can be:
             str, list, dict (FeedParserDict), bool, datetime.datetime object or time.struct_time
         """
-        try:
-            if tag_content["type"] == "text/html":
-                return TagType(2)
-        except (KeyError, TypeError):
-            html_tags = ["<a>", "<a href", "<img", "<p>", "<b>", "</li>", "</ul>"]
-            if any(word in str(tag_content) for word in html_tags):
-                return TagType(2)
-
-        if isinstance(tag_content, dict):
-            return TagType(3)
-        elif isinstance(tag_content, list):
-            return TagType(4)
-        else:
-            return TagType(1)
+        return get_tag_content_type(tag_content)
+
+    async def _get_url_content(self, url, *, conditional: bool = False):
+        """
+        Helper for rss add/_valid_url.
 
-    async def _get_url_content(self, url):
-        """Helper for rss add/_valid_url."""
+        With `conditional`, the ETag/Last-Modified headers from the last conditional download of this url
+        are sent along, and `None, None` is returned if the server answers that the feed wasn't modified.
+        """
         try:
+            headers = {}
             # force github.com to serve us xml instead of json
-            headers = self._headers
             if "github.com" in url:
                 headers["Accept"] = "application/vnd.github+xml"
 
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-                async with session.get(url) as resp:
-                    if resp.status == 404:
-                        friendly_msg = "The server returned 404 Not Found. Check your url and try again."
-                        return None, friendly_msg
-                    html = await resp.read()
+            validators = self._conditional_headers.get(url, {}) if conditional else {}
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+            async with self._session.get(url, headers=headers) as resp:
+                if resp.status == 304 and validators:
+                    self._fetch_stats["not_modified"] += 1
+                    return None, None
+                if resp.status == 404:
+                    friendly_msg = "The server returned 404 Not Found. Check your url and try again."
+                    return None, friendly_msg
+                html = await resp.read()
+
+            self._fetch_stats["full"] += 1
+            if conditional:
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+                if etag or last_modified:
+                    self._conditional_headers[url] = {"etag": etag, "last_modified": last_modified}
+                else:
+                    self._conditional_headers.pop(url, None)
             return html, None
         except aiohttp.client_exceptions.ClientConnectorError:
             friendly_msg = "There was an OSError or the connection failed."
@@ -466,13 +365,20 @@ class RSS(commands.Cog):
             log.error(msg, exc_info=True)
             return None, friendly_msg
 
-    async def _fetch_feedparser_object(self, url: str):
-        """Get a full feedparser object from a url: channel header + items."""
-        html, error_msg = await self._get_url_content(url)
+    async def _fetch_feedparser_object(self, url: str, *, conditional: bool = False):
+        """
+        Get a full feedparser object from a url: channel header + items.
+
+        With `conditional`, a feed that wasn't modified since the last conditional fetch
+        isn't parsed again and comes back with `not_modified` set.
+        """
+        html, error_msg = await self._get_url_content(url, conditional=conditional)
+        if html is None and error_msg is None:
+            return SimpleNamespace(entries=None, error=None, not_modified=True, url=url)
         if not html:
             return SimpleNamespace(entries=None, error=error_msg, url=url)
 
-        feedparser_obj = feedparser.parse(html)
+        feedparser_obj = await self._run_parse_job(parse_feed, html)
         if feedparser_obj.bozo:
             error_msg = f"Bozo feed: feedparser is unable to parse the response from {url}.\n"
             error_msg += f"Feedparser error message: `{feedparser_obj.bozo_exception}`"
@@ -480,12 +386,49 @@ class RSS(commands.Cog):
 
         return feedparser_obj
 
+    async def _fetch_feedparser_object_cached(self, url: str):
+        """
+        Get a full feedparser object from a url for the feed loop.
+
+        While a feed cycle is running, each distinct url is only downloaded and parsed once
+        and the result is shared between every channel that is subscribed to it.
+        """
+        if self._cycle_feed_cache is None:
+            return await self._fetch_feedparser_object(url, conditional=True)
+
+        fetch_task = self._cycle_feed_cache.get(url)
+        if fetch_task is None:
+            fetch_task = asyncio.ensure_future(self._fetch_feedparser_object_scheduled(url))
+            self._cycle_feed_cache[url] = fetch_task
+        # shielded so one channel's check being cancelled doesn't cancel the fetch for the others
+        return await asyncio.shield(fetch_task)
+
+    async def _fetch_feedparser_object_scheduled(self, url: str):
+        """Fetch a feed for the feed loop and tell the scheduler how it went."""
+        try:
+            feedparser_obj = await self._fetch_feedparser_object(url, conditional=True)
+        except Exception:
+            self._scheduler.record_failure(url)
+            raise
+
+        if getattr(feedparser_obj, "not_modified", False):
+            self._scheduler.record_success(url)
+        elif feedparser_obj.entries is None:
+            # a SimpleNamespace with an error message
+            self._scheduler.record_failure(url)
+        else:
+            entry_times = [await self._time_tag_validation(entry) for entry in feedparser_obj.entries]
+            self._scheduler.record_entries(url, entry_times)
+        return feedparser_obj
+
     async def _add_to_feedparser_object(self, feedparser_obj: feedparser.util.FeedParserDict, url: str):
         """
         Input: A feedparser object
         Process: Append custom tags to the object from the custom formatters
         Output: A feedparser object with additional attributes
         """
+        # work on a shallow copy, the parsed entry can be shared between channels subscribed to the same url
+        feedparser_obj = feedparser.util.FeedParserDict(feedparser_obj)
         feedparser_plus_obj = await self._append_bs4_tags(feedparser_obj, url)
         feedparser_plus_obj["template_tags"] = sorted(feedparser_plus_obj.keys())
 
@@ -584,14 +527,13 @@ class RSS(commands.Cog):
         current_feed_time: int,
     ):
         """Updates last title and last link seen for comparison on next feed pull."""
-        async with self.config.channel(channel).feeds() as feed_data:
-            try:
-                feed_data[feed_name]["last_title"] = current_feed_title
-                feed_data[feed_name]["last_link"] = current_feed_link
-                feed_data[feed_name]["last_time"] = current_feed_time
-            except KeyError:
-                # the feed was deleted during a _get_current_feed execution
-                pass
+        self._feed_state.update(
+            channel.id,
+            feed_name,
+            last_title=current_feed_title,
+            last_link=current_feed_link,
+            last_time=current_feed_time,
+        )
 
     async def _valid_url(self, url: str, feed_check=True):
         """Helper for rss add."""
@@ -608,7 +550,7 @@ class RSS(commands.Cog):
                     raise NoFeedContent(error_msg)
                     return False
 
-                rss = feedparser.parse(text)
+                rss = await self._run_parse_job(parse_feed, text)
                 if rss.bozo:
                     error_message = rss.feed.get("summary", str(rss))[:1500]
                     error_message = re.sub(IPV4_RE, "[REDACTED IP ADDRESS]", error_message)
@@ -628,10 +570,8 @@ class RSS(commands.Cog):
     async def _validate_image(self, url: str):
         """Helper for _get_current_feed_embed."""
         try:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                async with session.get(url) as resp:
-                    image = await resp.content.read(261)
+            async with self._session.get(url) as resp:
+                image = await resp.content.read(261)
             img = io.BytesIO(image)
             file_type = filetype.guess(img)
             if not file_type:
@@ -872,6 +812,41 @@ class RSS(commands.Cog):
 
         await ctx.send(f"Embeds for {bold(feed_name)} are {toggle_text}.")
 
+    @checks.is_owner()
+    @rss.command(name="executor")
+    async def _rss_executor(self, ctx, executor_type: str = None, workers: int = None):
+        """
+        Set where feed parsing runs.
+
+        Parsing large feeds can take a while, so it is done outside of the bot's event loop.
+        `thread` (the default) uses a thread pool, `process` uses separate processes which
+        keeps the bot responsive even on very large feeds, at the cost of some extra memory.
+        Use this command with no values to see the current settings.
+        """
+        if executor_type is None:
+            executor_type = await self.config.parse_executor()
+            workers = await self.config.parse_workers()
+            await ctx.send(f"Feeds are parsed in a {executor_type} pool with {workers} workers.")
+            return
+
+        executor_type = executor_type.lower()
+        if executor_type not in ("thread", "process"):
+            await ctx.send("The executor type must be `thread` or `process`.")
+            return
+        if workers is None:
+            workers = await self.config.parse_workers()
+        if not 1 <= workers <= 32:
+            await ctx.send("Use between 1 and 32 workers.")
+            return
+
+        await self.config.parse_executor.set(executor_type)
+        await self.config.parse_workers.set(workers)
+        if self._parse_executor:
+            # the next parse job will build a new executor with these settings
+            old_executor, self._parse_executor = self._parse_executor, None
+            old_executor.shutdown(wait=False)
+        await ctx.send(f"Feeds will now be parsed in a {executor_type} pool with {workers} workers.")
+
     @rss.command(name="find")
     async def _rss_find(self, ctx, website_url: str):
         """
@@ -880,31 +855,27 @@ class RSS(commands.Cog):
         The site must have identified their feed in the html of the page based on RSS feed type standards.
         """
         async with ctx.typing():
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                try:
-                    async with session.get(website_url) as response:
-                        soup = BeautifulSoup(await response.text(errors="replace"), "html.parser")
-                except (aiohttp.client_exceptions.ClientConnectorError, aiohttp.client_exceptions.ClientPayloadError):
-                    await ctx.send("I can't reach that website.")
-                    return
-                except aiohttp.client_exceptions.InvalidURL:
-                    await ctx.send(
-                        "That seems to be an invalid URL. Use a full website URL like `https://www.site.com/`."
-                    )
-                    return
-                except aiohttp.client_exceptions.ServerDisconnectedError:
-                    await ctx.send("The server disconnected early without a response.")
-                    return
-                except asyncio.exceptions.TimeoutError:
-                    await ctx.send("The site didn't respond in time or there was no response.")
-                    return
-                except Exception as e:
-                    msg = "There was an issue trying to find a feed in that site. "
-                    msg += "Please check your console for more information."
-                    log.exception(e, exc_info=e)
-                    await ctx.send(msg)
-                    return
+            try:
+                async with self._session.get(website_url) as response:
+                    soup = BeautifulSoup(await response.text(errors="replace"), "html.parser")
+            except (aiohttp.client_exceptions.ClientConnectorError, aiohttp.client_exceptions.ClientPayloadError):
+                await ctx.send("I can't reach that website.")
+                return
+            except aiohttp.client_exceptions.InvalidURL:
+                await ctx.send("That seems to be an invalid URL. Use a full website URL like `https://www.site.com/`.")
+                return
+            except aiohttp.client_exceptions.ServerDisconnectedError:
+                await ctx.send("The server disconnected early without a response.")
+                return
+            except asyncio.exceptions.TimeoutError:
+                await ctx.send("The site didn't respond in time or there was no response.")
+                return
+            except Exception as e:
+                msg = "There was an issue trying to find a feed in that site. "
+                msg += "Please check your console for more information."
+                log.exception(e, exc_info=e)
+                await ctx.send(msg)
+                return
 
         if "403 Forbidden" in soup.get_text():
             await ctx.send("I received a '403 Forbidden' message while trying to reach that site.")
@@ -1239,6 +1210,26 @@ class RSS(commands.Cog):
         for page in pagify(msg, delims=["\n"], page_length=1800):
             await ctx.send(page)
 
+    @checks.is_owner()
+    @rss.command(name="stats")
+    async def _rss_stats(self, ctx):
+        """Show statistics for the feed checking loop."""
+        if self._last_cycle_time is None:
+            await ctx.send("The feed loop hasn't finished a cycle yet.")
+            return
+
+        feeds_per_second = self._post_queue_size / self._last_cycle_time if self._last_cycle_time else 0
+        msg = f"[Feeds checked last cycle]: {self._post_queue_size}\n"
+        msg += f"[Last cycle time]:          {self._last_cycle_time:.2f}s\n"
+        msg += f"[Feeds per second]:         {feeds_per_second:.2f}\n"
+        msg += f"[Distinct feed urls]:       {self._last_cycle_urls}\n"
+        msg += f"[Full downloads]:           {self._fetch_stats['full']}\n"
+        msg += f"[Not modified (304)]:       {self._fetch_stats['not_modified']}\n"
+        msg += f"[Feed state writes]:        {self._feed_state.writes}\n"
+        msg += f"[Feed urls scheduled]:      {len(self._scheduler)}\n"
+        msg += f"[Failing feed urls]:        {self._scheduler.failing()}\n"
+        await ctx.send(box(msg, lang="ini"))
+
     @rss.group(name="tag")
     async def _rss_tag(self, ctx):
         """RSS post tag qualification."""
@@ -1399,6 +1390,33 @@ class RSS(commands.Cog):
         for msg_part in pagify(msg, delims=["\n\t", "\n\n"], page_length=1900):
             await ctx.send(box(msg_part.rstrip("\n\t"), lang="ansi"))
 
+    @checks.is_owner()
+    @rss.command(name="workers")
+    async def _rss_workers(self, ctx, max_workers: int = None, max_per_host: int = None):
+        """
+        Set how many feeds are checked at the same time.
+
+        `max_workers` is the total amount of feeds checked at once, and `max_per_host` is the amount
+        of feeds checked at once on the same website, so that one site isn't hammered with requests.
+        Use this command with no values to see the current settings.
+        """
+        if max_workers is None:
+            max_workers = await self.config.max_workers()
+            max_per_host = await self.config.max_per_host()
+            await ctx.send(f"Checking up to {max_workers} feeds at once, and {max_per_host} per website.")
+            return
+
+        if max_per_host is None:
+            max_per_host = await self.config.max_per_host()
+
+        if not 1 <= max_workers <= 100 or not 1 <= max_per_host <= max_workers:
+            await ctx.send("Use between 1 and 100 workers, and no more workers per website than in total.")
+            return
+
+        await self.config.max_workers.set(max_workers)
+        await self.config.max_per_host.set(max_per_host)
+        await ctx.send(f"Now checking up to {max_workers} feeds at once, and {max_per_host} per website.")
+
     @rss.command(name="version", hidden=True)
     async def _rss_version(self, ctx):
         """Show the RSS version."""
@@ -1407,18 +1425,23 @@ class RSS(commands.Cog):
     async def get_current_feed(self, channel: GuildMessageable, name: str, rss_feed: dict, *, force: bool = False):
         """Takes an RSS feed and builds an object with all extra tags"""
         log.debug(f"getting feed {name} on cid {channel.id}")
+        # the feed state table is ahead of config until it's flushed at the end of the feed cycle
+        feed_state = self._feed_state.get(channel.id, name)
+        if feed_state:
+            rss_feed = {**rss_feed, **feed_state}
         url = rss_feed["url"]
-        last_title = rss_feed["last_title"]
-        # last_link is a get for feeds saved before RSS 1.1.5 which won't have this attrib till it's checked once
-        last_link = rss_feed.get("last_link", None)
-        # last_time is a get for feeds saved before RSS 1.1.7 which won't have this attrib till it's checked once
-        last_time = rss_feed.get("last_time", None)
         template = rss_feed["template"]
         message = None
 
-        feedparser_obj = await self._fetch_feedparser_object(url)
+        if force:
+            feedparser_obj = await self._fetch_feedparser_object(url)
+        else:
+            feedparser_obj = await self._fetch_feedparser_object_cached(url)
         if not feedparser_obj:
             return
+        if getattr(feedparser_obj, "not_modified", False):
+            log.debug(f"Feed {name} on cid {channel.id} wasn't modified since the last check.")
+            return
         try:
             log.debug(f"{feedparser_obj.error} Channel: {channel.id}")
             return
@@ -1435,12 +1458,31 @@ class RSS(commands.Cog):
             # this feed does not have posts, but it has a header with channel information
             sorted_feed_by_post_time = [feedparser_obj.feed]
 
-        if not force:
+        if force:
+            # we only need one feed entry if this is from rss force
+            new_entries = sorted_feed_by_post_time[:1]
+        else:
+            fingerprints = self._feed_state.get_fingerprints(channel.id, name)
+            if fingerprints is None:
+                # feeds saved before RSS 2.2.0 have no fingerprints yet, so this check falls back
+                # to the last scraped title/link/time and the fingerprints take over from the next one
+                new_entries = await self._find_new_entries_by_last_scraped(
+                    channel, name, rss_feed, sorted_feed_by_post_time
+                )
+                fingerprints = EntryFingerprints()
+                fingerprints.add_entries(sorted_feed_by_post_time)
+                self._feed_state.set_fingerprints(channel.id, name, fingerprints)
+            else:
+                new_entries = [
+                    entry
+                    for entry in sorted_feed_by_post_time
+                    if EntryFingerprints.fingerprint(entry) not in fingerprints
+                ]
+                # only write the fingerprints back when the set itself changed
+                if fingerprints.add_entries(sorted_feed_by_post_time):
+                    self._feed_state.set_fingerprints(channel.id, name, fingerprints)
+
             entry_time = await self._time_tag_validation(sorted_feed_by_post_time[0])
-            if (last_time and entry_time) is not None:
-                if last_time > entry_time:
-                    log.debug("Not posting because new entry is older than last saved entry.")
-                    return
             try:
                 title = sorted_feed_by_post_time[0].title
             except AttributeError:
@@ -1451,82 +1493,15 @@ class RSS(commands.Cog):
                 link = ""
             await self._update_last_scraped(channel, name, title, link, entry_time)
 
-        feedparser_plus_objects = []
-        for entry in sorted_feed_by_post_time:
-            # sometimes there's no title or no link attribute and feedparser doesn't really play nice with that
-            try:
-                entry_title = entry.title
-            except AttributeError:
-                entry_title = ""
-            try:
-                entry_link = entry.link
-            except AttributeError:
-                entry_link = ""
-
-            # find the updated_parsed (checked first) or an published_parsed tag if they are present
-            entry_time = await self._time_tag_validation(entry)
-
-            # we only need one feed entry if this is from rss force
-            if force:
-                feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                feedparser_plus_objects.append(feedparser_plus_obj)
-                break
-
-            # TODO: spammy debug logs to vvv
-
-            # there's a post time to compare
-            elif (entry_time and last_time) is not None:
-                # this is a post with an updated time with the same link and title, maybe an edited post.
-                # if a feed is spamming updated times with no content update, consider adding the full website
-                # (www.website.com) to the rss parse command
-                if (last_title == entry_title) and (last_link == entry_link) and (last_time < entry_time):
-                    log.debug(f"New update found for an existing post in {name} on cid {channel.id}")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-                else:
-                    # a post from the future, or we are caught up
-                    if last_time >= entry_time:
-                        log.debug(f"Up to date on {name} on cid {channel.id}")
-                        break
-
-                    # a new post
-                    if last_link != entry_link:
-                        log.debug(f"New entry found via time and link validation for feed {name} on cid {channel.id}")
-                        feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                        feedparser_plus_objects.append(feedparser_plus_obj)
-
-                    else:
-                        # I don't belive this ever should be hit but this is a catch to debug
-                        # a feed in case one ever appears that does this
-                        log.debug(
-                            f"*** This post qualified via timestamp check but has the same link as last: {entry_title[:25]} | {entry_link}"
-                        )
-
-            # this is a post that has no time comparison information because one or both timestamps are None.
-            # compare the title and link to see if it's the same post as previous.
-            # this may need more definition in the future if there is a feed that provides new titles but not new links etc
-            elif entry_time is None or last_time is None:
-                if last_title == entry_title and last_link == entry_link:
-                    log.debug(f"Up to date on {name} on {channel.id} via link match, no time to compare")
-                    break
-                else:
-                    log.debug(f"New entry found for feed {name} on cid {channel.id} via new link or title")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-
-            # we found a match for a previous feed post
-            else:
-                log.debug(
-                    f"Breaking rss entry loop for {name} on {channel.id}, we found where we are supposed to be caught up to"
-                )
-                break
-
-        #  TODO: fix rss losing its place on on store.steampowered.com feeds/post lists
-
-        if len(feedparser_plus_objects) == len(sorted_feed_by_post_time):
+        if len(new_entries) > 1 and len(new_entries) == len(sorted_feed_by_post_time):
             msg = (f"Couldn't match anything for feed {name} on cid {channel.id}, or switching between feed header and feed entry, only posting 1 post")
             log.debug(msg)
-            feedparser_plus_objects = [feedparser_plus_objects[0]]
+            new_entries = new_entries[:1]
+
+        feedparser_plus_objects = []
+        for entry in new_entries:
+            feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
+            feedparser_plus_objects.append(feedparser_plus_obj)
 
         if not feedparser_plus_objects:
             # early-exit so that we don't dispatch when there's no updates
@@ -1641,6 +1616,89 @@ class RSS(commands.Cog):
             force=force,
         )
 
+    async def _find_new_entries_by_last_scraped(
+        self, channel: GuildMessageable, name: str, rss_feed: dict, sorted_feed_by_post_time: list
+    ):
+        """
+        Find new entries by comparing them against the last scraped title, link and time.
+
+        Only used for feeds that don't have entry fingerprints yet.
+        """
+        last_title = rss_feed["last_title"]
+        # last_link is a get for feeds saved before RSS 1.1.5 which won't have this attrib till it's checked once
+        last_link = rss_feed.get("last_link", None)
+        # last_time is a get for feeds saved before RSS 1.1.7 which won't have this attrib till it's checked once
+        last_time = rss_feed.get("last_time", None)
+
+        entry_time = await self._time_tag_validation(sorted_feed_by_post_time[0])
+        if (last_time and entry_time) is not None:
+            if last_time > entry_time:
+                log.debug("Not posting because new entry is older than last saved entry.")
+                return []
+
+        new_entries = []
+        for entry in sorted_feed_by_post_time:
+            # sometimes there's no title or no link attribute and feedparser doesn't really play nice with that
+            try:
+                entry_title = entry.title
+            except AttributeError:
+                entry_title = ""
+            try:
+                entry_link = entry.link
+            except AttributeError:
+                entry_link = ""
+
+            # find the updated_parsed (checked first) or an published_parsed tag if they are present
+            entry_time = await self._time_tag_validation(entry)
+
+            # TODO: spammy debug logs to vvv
+
+            # there's a post time to compare
+            if (entry_time and last_time) is not None:
+                # this is a post with an updated time with the same link and title, maybe an edited post.
+                # if a feed is spamming updated times with no content update, consider adding the full website
+                # (www.website.com) to the rss parse command
+                if (last_title == entry_title) and (last_link == entry_link) and (last_time < entry_time):
+                    log.debug(f"New update found for an existing post in {name} on cid {channel.id}")
+                    new_entries.append(entry)
+                else:
+                    # a post from the future, or we are caught up
+                    if last_time >= entry_time:
+                        log.debug(f"Up to date on {name} on cid {channel.id}")
+                        break
+
+                    # a new post
+                    if last_link != entry_link:
+                        log.debug(f"New entry found via time and link validation for feed {name} on cid {channel.id}")
+                        new_entries.append(entry)
+
+                    else:
+                        # I don't belive this ever should be hit but this is a catch to debug
+                        # a feed in case one ever appears that does this
+                        log.debug(
+                            f"*** This post qualified via timestamp check but has the same link as last: {entry_title[:25]} | {entry_link}"
+                        )
+
+            # this is a post that has no time comparison information because one or both timestamps are None.
+            # compare the title and link to see if it's the same post as previous.
+            # this may need more definition in the future if there is a feed that provides new titles but not new links etc
+            elif entry_time is None or last_time is None:
+                if last_title == entry_title and last_link == entry_link:
+                    log.debug(f"Up to date on {name} on {channel.id} via link match, no time to compare")
+                    break
+                else:
+                    log.debug(f"New entry found for feed {name} on cid {channel.id} via new link or title")
+                    new_entries.append(entry)
+
+            # we found a match for a previous feed post
+            else:
+                log.debug(
+                    f"Breaking rss entry loop for {name} on {channel.id}, we found where we are supposed to be caught up to"
+                )
+                break
+
+        return new_entries
+
     async def _get_current_feed_embed(
         self,
         channel: GuildMessageable,
@@ -1698,64 +1756,134 @@ class RSS(commands.Cog):
     async def read_feeds(self):
         """Feed poster loop."""
         await self.bot.wait_until_red_ready()
-        await self._put_feeds_in_queue()
-        self._post_queue_size = self._post_queue.qsize()
+        await self._feed_state.load()
+        subscriptions_loaded_at = None
 
-        # TODO: very large queues with a lot of RSS feeds (1000+) cause this to fall behind
         while True:
             try:
-                queue_item = await self._get_next_in_queue()
-                if not queue_item:
-                    # the queue is empty
-                    config_data = await self.config.all_channels()
-                    if not config_data:
-                        # nothing to check
-                        log.debug(f"Sleeping, nothing to do")
-                        await asyncio.sleep(30)
-                        continue
-                    if self._post_queue_size < 300:
-                        # less than 300 entries to check means 1/sec check times
-                        # the wait is (5 min - entry count) before posting again
-                        wait = 300 - self._post_queue_size
-                    else:
-                        # more than 300 entries means we used the whole 5 min
-                        # to check and post feeds so don't wait any longer to start again
-                        wait = 0
-
-                    log.debug(f"Waiting {wait}s before starting...")
-                    await asyncio.sleep(wait)
-                    await self._put_feeds_in_queue()
-                    if self._post_queue.qsize() > self._post_queue_size:
-                        # there's been more feeds added so let's update the total size
-                        # so feeds have the proper wait time @ > 300 feeds
-                        log.debug(f"Updating total queue size to {self._post_queue.qsize()}")
-                        self._post_queue_size = self._post_queue.qsize()
+                now = time.monotonic()
+                if (
+                    self._subscriptions_stale
+                    or subscriptions_loaded_at is None
+                    or now - subscriptions_loaded_at >= 300
+                ):
+                    await self._load_feed_subscriptions()
+                    subscriptions_loaded_at = now
+
+                if not self._subscriptions:
+                    # nothing to check
+                    log.debug("Sleeping, nothing to do")
+                    await asyncio.sleep(30)
                     continue
-                else:
-                    try:
-                        # queue_item is a List of channel_priority: int, total_priority: int, queue_item: SimpleNamespace
-                        await self.get_current_feed(
-                            queue_item[2].channel, queue_item[2].feed_name, queue_item[2].feed_data
-                        )
-                    except aiohttp.client_exceptions.InvalidURL as e:
-                        log.debug(f"Feed at {e.url} is bad or took too long to respond.")
-                        continue
 
-                    if self._post_queue_size < 300:
-                        wait = 1
-                    else:
-                        wait = (300 - 10) / self._post_queue_size
-                    log.debug(f"sleeping for {wait}...")
-                    await asyncio.sleep(wait)
+                due_urls = self._scheduler.pop_due(now)
+                if due_urls:
+                    await self._run_feed_cycle(due_urls)
+
+                # wake up for the next due feed, but often enough to notice feed changes
+                next_due = self._scheduler.next_due()
+                wait = 30 if next_due is None else min(max(next_due - time.monotonic(), 1), 30)
+                await asyncio.sleep(wait)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 log.error("An error has occurred in the RSS cog. Please report it.", exc_info=e)
+                await asyncio.sleep(30)
                 continue
 
-    async def _put_feeds_in_queue(self):
-        log.debug("Putting feeds in queue")
+    async def _run_feed_cycle(self, due_urls: list):
+        """Check every feed subscribed to one of the due urls and schedule those urls again."""
+        cycle_start = time.monotonic()
+        await self._put_feeds_in_queue(due_urls)
+        queue_size = self._post_queue.qsize()
+        if queue_size:
+            self._post_queue_size = queue_size
+            await self._run_feed_workers()
+            written = await self._feed_state.flush()
+            log.debug(f"Saved the last scraped state of feeds in {written} channels")
+
+        for url in due_urls:
+            # the url may have been dropped by a subscription reload during the cycle
+            if url in self._subscriptions:
+                self._scheduler.reschedule(url)
+
+        if not queue_size:
+            return
+        cycle_time = time.monotonic() - cycle_start
+        self._last_cycle_time = cycle_time
+        log.debug(f"Checked {queue_size} feeds from {len(due_urls)} urls in {cycle_time:.2f}s")
+        if cycle_time > 300:
+            log.warning(
+                f"Checking {queue_size} feeds took {cycle_time:.2f}s, which is longer than the 5 minute "
+                "minimum feed interval. Consider raising the worker count with `[p]rss workers`."
+            )
+
+    async def _run_feed_workers(self):
+        """Drain the post queue with a pool of concurrent feed workers."""
+        max_workers = await self.config.max_workers()
+        max_per_host = await self.config.max_per_host()
+        self._host_active.clear()
+        self._host_backlog.clear()
+
+        self._cycle_feed_cache = {}
+
+        worker_count = max(1, min(max_workers, self._post_queue.qsize()))
+        workers = [asyncio.create_task(self._feed_worker(max_per_host)) for _ in range(worker_count)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            for fetch_task in self._cycle_feed_cache.values():
+                fetch_task.cancel()
+            self._last_cycle_urls = len(self._cycle_feed_cache)
+            self._cycle_feed_cache = None
+
+    async def _feed_worker(self, max_per_host: int):
+        """
+        Pull feeds from the post queue in priority order until it is empty.
+
+        A feed whose host is already being checked by `max_per_host` workers is put in that
+        host's backlog instead of blocking this worker. The worker that holds the host slot
+        picks up the backlog before releasing it, so the backlog is always drained.
+        """
+        while True:
+            queue_item = await self._get_next_in_queue()
+            if not queue_item:
+                return
+
+            host = urlparse(queue_item[2].feed_data.get("url", "")).netloc
+            if self._host_active[host] >= max_per_host:
+                self._host_backlog[host].append(queue_item)
+                continue
+
+            self._host_active[host] += 1
+            try:
+                while queue_item:
+                    await self._check_queue_item(queue_item)
+                    backlog = self._host_backlog[host]
+                    queue_item = backlog.popleft() if backlog else None
+            finally:
+                self._host_active[host] -= 1
+
+    async def _check_queue_item(self, queue_item: list):
+        """Helper for the feed workers."""
+        # queue_item is a List of channel_priority: int, total_priority: int, queue_item: SimpleNamespace
+        rss_feed = queue_item[2]
+        try:
+            await self.get_current_feed(rss_feed.channel, rss_feed.feed_name, rss_feed.feed_data)
+        except aiohttp.client_exceptions.InvalidURL as e:
+            log.debug(f"Feed at {e.url} is bad or took too long to respond.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error(f"An error has occurred checking the feed {rss_feed.feed_name}. Please report it.", exc_info=e)
+
+    async def _load_feed_subscriptions(self):
+        """Map every feed url to the queue entries of the channel feeds subscribed to it."""
+        log.debug("Loading feed subscriptions")
+        subscriptions = collections.defaultdict(list)
         try:
             config_data = await self.config.all_channels()
             total_index = 0
@@ -1774,11 +1902,23 @@ class RSS(commands.Cog):
                         channel_index = keys.index(feed_name)
                         total_index += 1
                         queue_entry = [channel_index, total_index, rss_feed]
-                        log.debug(f"Putting {channel_index}-{total_index}-{channel}-{feed_name} in queue")
-                        await self._post_queue.put(queue_entry)
+                        subscriptions[feed_data["url"]].append(queue_entry)
 
         except Exception as e:
             log.exception(e, exc_info=e)
+            return
+
+        self._subscriptions = subscriptions
+        self._subscriptions_stale = False
+        self._scheduler.sync(subscriptions.keys())
+
+    async def _put_feeds_in_queue(self, urls: list):
+        log.debug("Putting feeds in queue")
+        for url in urls:
+            for queue_entry in self._subscriptions.get(url, []):
+                channel_index, total_index, rss_feed = queue_entry
+                log.debug(f"Putting {channel_index}-{total_index}-{rss_feed.channel}-{rss_feed.feed_name} in queue")
+                await self._post_queue.put(queue_entry)
 
     async def _get_next_in_queue(self):
         try:
@@ -0,0 +1,112 @@
+import heapq
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+
+class FeedScheduler:
+    """
+    Decides when each feed url is checked next.
+
+    Feeds are polled at a rate based on how often they have posted recently,
+    and feeds that keep failing back off exponentially. Due times are kept
+    in a heap so finding the feeds to check is cheap no matter how many
+    feeds there are. All times are from `time.monotonic`.
+    """
+
+    # no feed is checked more often than this, this was the old fixed rate
+    MIN_INTERVAL = 300
+    # no working feed goes longer than this without a check
+    MAX_INTERVAL = 4 * 60 * 60
+    # longest wait between checks of a failing feed
+    MAX_BACKOFF = 12 * 60 * 60
+    # check a feed this many times per average gap between its posts
+    CHECKS_PER_POST = 8
+    # amount of recent post timestamps kept per feed
+    HISTORY_SIZE = 20
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        # url -> due time, entries in the heap that don't match this are stale
+        self._due: Dict[str, float] = {}
+        # url -> recent post timestamps, newest first
+        self._entry_times: Dict[str, List[int]] = {}
+        self._failures: Counter = Counter()
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, url: str, due: float):
+        self._due[url] = due
+        heapq.heappush(self._heap, (due, url))
+
+    def remove(self, url: str):
+        # the heap entry is skipped when it comes up
+        self._due.pop(url, None)
+        self._entry_times.pop(url, None)
+        self._failures.pop(url, None)
+
+    def sync(self, urls: Iterable[str]):
+        """Start tracking new urls, due right away, and stop tracking urls that are gone."""
+        urls = set(urls)
+        for url in list(self._due):
+            if url not in urls:
+                self.remove(url)
+        now = time.monotonic()
+        for url in urls:
+            if url not in self._due:
+                self.schedule(url, now)
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Remove and return every url that is due to be checked."""
+        now = time.monotonic() if now is None else now
+        due_urls = []
+        while self._heap and self._heap[0][0] <= now:
+            due, url = heapq.heappop(self._heap)
+            if self._due.get(url) != due:
+                continue
+            del self._due[url]
+            due_urls.append(url)
+        return due_urls
+
+    def next_due(self) -> Optional[float]:
+        """The time the next url is due, if any are scheduled."""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def record_entries(self, url: str, timestamps: Iterable[Optional[int]]):
+        """Record a successful check and the post timestamps found in the feed."""
+        self._failures.pop(url, None)
+        known = set(self._entry_times.get(url, []))
+        known.update(timestamp for timestamp in timestamps if timestamp)
+        self._entry_times[url] = sorted(known, reverse=True)[: self.HISTORY_SIZE]
+
+    def record_success(self, url: str):
+        """Record a successful check with no new data, like a 304 response."""
+        self._failures.pop(url, None)
+
+    def record_failure(self, url: str):
+        self._failures[url] += 1
+
+    def failing(self) -> int:
+        """Amount of urls that failed their last check."""
+        return len(self._failures)
+
+    def interval(self, url: str) -> float:
+        """Seconds until the next check of this url."""
+        failures = self._failures.get(url, 0)
+        if failures:
+            return min(self.MIN_INTERVAL * 2 ** failures, self.MAX_BACKOFF)
+
+        entry_times = self._entry_times.get(url, [])
+        if len(entry_times) < 2:
+            # nothing to base a guess on
+            return self.MIN_INTERVAL
+        average_gap = (entry_times[0] - entry_times[-1]) / (len(entry_times) - 1)
+        return min(max(average_gap / self.CHECKS_PER_POST, self.MIN_INTERVAL), self.MAX_INTERVAL)
+
+    def reschedule(self, url: str, now: Optional[float] = None):
+        """Schedule the next check of a url that was just checked."""
+        now = time.monotonic() if now is None else now
+        self.schedule(url, now + self.interval(url))
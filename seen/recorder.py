@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+_MEMBER_MASK = (1 << 64) - 1
+
+
+class SeenRecorder:
+    """
+    Collects last seen timestamps between flushes to the store.
+
+    Every listener ends up in `record`, which only stores the current tick under the
+    pair packed into a single int. The tick is the time in whole seconds, refreshed
+    once a second by `start`'s task instead of on every event. Once `max_pending`
+    pairs are waiting, `full` is set so the flush doesn't wait for its next round.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.now = int(time.time())
+        self.full = asyncio.Event()
+        self._pending: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        # counters for `[p]seenset stats`
+        self.events = 0
+        self.events_per_second = 0
+        self.peak_events_per_second = 0
+        self.flushes = 0
+        self.early_flushes = 0
+        self.last_flush_size = 0
+        self.largest_flush_size = 0
+        self._events_at_tick = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._tick())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(1)
+            self.now = int(time.time())
+            self.events_per_second = self.events - self._events_at_tick
+            self._events_at_tick = self.events
+            if self.events_per_second > self.peak_events_per_second:
+                self.peak_events_per_second = self.events_per_second
+
+    def record(self, guild_id: int, member_id: int):
+        self._pending[guild_id << 64 | member_id] = self.now
+        self.events += 1
+        if len(self._pending) >= self.max_pending:
+            self.full.set()
+
+    def get(self, guild_id: int, member_id: int) -> Optional[int]:
+        return self._pending.get(guild_id << 64 | member_id)
+
+    def forget_member(self, member_id: int):
+        for key in [key for key in self._pending if key & _MEMBER_MASK == member_id]:
+            del self._pending[key]
+
+    def take(self) -> List[Tuple[int, int, int]]:
+        """Hand over the pending pairs as (guild_id, member_id, seen) rows and start over."""
+        pending, self._pending = self._pending, {}
+        if self.full.is_set():
+            self.early_flushes += 1
+            self.full.clear()
+        self.flushes += 1
+        self.last_flush_size = len(pending)
+        if self.last_flush_size > self.largest_flush_size:
+            self.largest_flush_size = self.last_flush_size
+        return [(key >> 64, key & _MEMBER_MASK, seen) for key, seen in pending.items()]
+
+    def restore(self, rows: List[Tuple[int, int, int]]):
+        """Put back rows that couldn't be written, without going back in time."""
+        for guild_id, member_id, seen in rows:
+            key = guild_id << 64 | member_id
+            if seen > self._pending.get(key, 0):
+                self._pending[key] = seen
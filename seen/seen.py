@@ -4,11 +4,20 @@ import datetime
 from typing import Union, Literal
 
 import discord
+import logging
 import time
 
 from redbot.core import Config, commands
+from redbot.core.utils.chat_formatting import box
+from redbot.core.data_manager import cog_data_path
 
-_SCHEMA_VERSION = 2
+from .recorder import SeenRecorder
+from .store import SeenStore
+
+log = logging.getLogger("red.aikaterna.seen")
+
+_SCHEMA_VERSION = 3
+_FLUSH_INTERVAL = 60
 
 
 class Seen(commands.Cog):
@@ -18,25 +27,28 @@ class Seen(commands.Cog):
         self, *, requester: Literal["discord", "owner", "user", "user_strict"], user_id: int,
     ):
         if requester in ["discord", "owner"]:
-            data = await self.config.all_members()
-            for guild_id, members in data.items():
-                if user_id in members:
-                    await self.config.member_from_ids(guild_id, user_id).clear()
+            self.recorder.forget_member(user_id)
+            await self.store.delete_member(user_id)
 
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, 2784481001, force_registration=True)
 
-        default_global = dict(schema_version=1)
+        default_global = dict(schema_version=1, max_pending=50000)
         default_member = dict(seen=None)
 
         self.config.register_global(**default_global)
         self.config.register_member(**default_member)
 
-        self._cache = {}
-        self._task = self.bot.loop.create_task(self._save_to_config())
+        self.recorder = SeenRecorder(max_pending=default_global["max_pending"])
+        self._task = None
+        self.store = SeenStore(cog_data_path(self) / "seen.db")
 
     async def initialize(self):
+        await self.store.open()
+        self.recorder.max_pending = await self.config.max_pending()
+        self.recorder.start()
+        self._task = self.bot.loop.create_task(self._save_to_store())
         asyncio.ensure_future(
             self._migrate_config(from_version=await self.config.schema_version(), to_version=_SCHEMA_VERSION)
         )
@@ -45,27 +57,15 @@ class Seen(commands.Cog):
         if from_version == to_version:
             return
         elif from_version < to_version:
+            # timestamps moved out of Config into the store, schema 1 had several per member
             all_guild_data = await self.config.all_members()
-            users_data = {}
+            rows = []
             for guild_id, guild_data in all_guild_data.items():
                 for user_id, user_data in guild_data.items():
-                    for _, v in user_data.items():
-                        if not v:
-                            v = None
-                        if user_id not in users_data:
-                            users_data[guild_id][user_id] = {"seen": v}
-                        else:
-                            if (v and not users_data[guild_id][user_id]["seen"]) or (
-                                v
-                                and users_data[guild_id][user_id]["seen"]
-                                and v > users_data[guild_id][user_id]["seen"]
-                            ):
-                                users_data[guild_id][user_id] = {"seen": v}
-
-            group = self.config._get_base_group(self.config.MEMBER)  # Bulk update to new scope
-            async with group.all() as new_data:
-                for guild_id, member_data in users_data.items():
-                    new_data[guild_id] = member_data
+                    seen = max((v for v in user_data.values() if v), default=None)
+                    if seen:
+                        rows.append((guild_id, user_id, int(seen)))
+            await self.store.write(rows)
 
             # new schema is now in place
             await self.config.schema_version.set(_SCHEMA_VERSION)
@@ -78,24 +78,15 @@ class Seen(commands.Cog):
     @commands.bot_has_permissions(embed_links=True)
     async def _seen(self, ctx, *, author: discord.Member):
         """Shows last time a user was seen in chat."""
-        member_seen_config = await self.config.member(author).seen()
-        member_seen_cache = self._cache.get(author.guild.id, {}).get(author.id, None)
+        member_seen = self.recorder.get(author.guild.id, author.id)
+        if not member_seen:
+            # anything in the recorder is newer than what's in the store
+            member_seen = await self.store.get(author.guild.id, author.id)
 
-        if not member_seen_cache and not member_seen_config:
+        if not member_seen:
             embed = discord.Embed(colour=discord.Color.red(), title="I haven't seen that user yet.")
             return await ctx.send(embed=embed)
 
-        if not member_seen_cache:
-            member_seen = member_seen_config
-        elif not member_seen_config:
-            member_seen = member_seen_cache
-        elif member_seen_cache > member_seen_config:
-            member_seen = member_seen_cache
-        elif member_seen_config > member_seen_cache:
-            member_seen = member_seen_config
-        else:
-            member_seen = member_seen_cache or member_seen_config
-
         now = int(time.time())
         time_elapsed = int(now - member_seen)
         output = self._dynamic_time(time_elapsed)
@@ -128,70 +119,94 @@ class Seen(commands.Cog):
         d, h = divmod(h, 24)
         return d, h, m
 
+    @commands.group()
+    @commands.is_owner()
+    async def seenset(self, ctx):
+        """Settings for the seen cog."""
+
+    @seenset.command()
+    async def maxpending(self, ctx, amount: commands.Range[int, 1000, None]):
+        """Set how many members can be waiting to be saved before they're saved early.
+
+        They are saved every minute otherwise."""
+        await self.config.max_pending.set(amount)
+        self.recorder.max_pending = amount
+        await ctx.send(f"Members will be saved early once {amount} are waiting.")
+
+    @seenset.command()
+    async def stats(self, ctx):
+        """Show the activity the cog is recording and saving."""
+        recorder = self.recorder
+        msg = (
+            f"Events recorded: {recorder.events}\n"
+            f"Events per second: {recorder.events_per_second} (peak {recorder.peak_events_per_second})\n"
+            f"Members waiting to be saved: {len(recorder)}/{recorder.max_pending}\n"
+            f"Saves: {recorder.flushes} ({recorder.early_flushes} early)\n"
+            f"Members per save: {recorder.last_flush_size} last, {recorder.largest_flush_size} largest"
+        )
+        await ctx.send(box(msg))
+
     @commands.Cog.listener()
     async def on_message(self, message):
-        if getattr(message, "guild", None):
-            if message.guild.id not in self._cache:
-                self._cache[message.guild.id] = {}
-            self._cache[message.guild.id][message.author.id] = int(time.time())
+        guild = message.guild
+        if guild is not None:
+            self.recorder.record(guild.id, message.author.id)
 
     @commands.Cog.listener()
     async def on_typing(
         self, channel: discord.abc.Messageable, user: Union[discord.User, discord.Member], when: datetime.datetime,
     ):
-        if getattr(user, "guild", None):
-            if user.guild.id not in self._cache:
-                self._cache[user.guild.id] = {}
-            self._cache[user.guild.id][user.id] = int(time.time())
+        guild = getattr(user, "guild", None)
+        if guild is not None:
+            self.recorder.record(guild.id, user.id)
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        if getattr(after, "guild", None):
-            if after.guild.id not in self._cache:
-                self._cache[after.guild.id] = {}
-            self._cache[after.guild.id][after.author.id] = int(time.time())
+        guild = after.guild
+        if guild is not None:
+            self.recorder.record(guild.id, after.author.id)
 
     @commands.Cog.listener()
     async def on_reaction_remove(self, reaction: discord.Reaction, user: Union[discord.Member, discord.User]):
-        if getattr(user, "guild", None):
-            if user.guild.id not in self._cache:
-                self._cache[user.guild.id] = {}
-            self._cache[user.guild.id][user.id] = int(time.time())
+        guild = getattr(user, "guild", None)
+        if guild is not None:
+            self.recorder.record(guild.id, user.id)
 
     @commands.Cog.listener()
     async def on_reaction_add(self, reaction: discord.Reaction, user: Union[discord.Member, discord.User]):
-        if getattr(user, "guild", None):
-            if user.guild.id not in self._cache:
-                self._cache[user.guild.id] = {}
-            self._cache[user.guild.id][user.id] = int(time.time())
+        guild = getattr(user, "guild", None)
+        if guild is not None:
+            self.recorder.record(guild.id, user.id)
 
-    def cog_unload(self):
-        self.bot.loop.create_task(self._clean_up())
-
-    async def _clean_up(self):
+    async def cog_unload(self):
         if self._task:
             self._task.cancel()
-        if self._cache:
-            group = self.config._get_base_group(self.config.MEMBER)  # Bulk update to config
-            async with group.all() as new_data:
-                for guild_id, member_data in self._cache.items():
-                    if str(guild_id) not in new_data:
-                        new_data[str(guild_id)] = {}
-                    for member_id, seen in member_data.items():
-                        new_data[str(guild_id)][str(member_id)] = {"seen": seen}
-
-    async def _save_to_config(self):
+        self.recorder.stop()
+        try:
+            await self._flush()
+        finally:
+            await self.store.close()
+
+    async def _flush(self):
+        """Write the pairs seen since the last flush to the store."""
+        if not len(self.recorder):
+            return
+        rows = self.recorder.take()
+        try:
+            await self.store.write(rows)
+        except Exception:
+            # keep them for the next flush
+            self.recorder.restore(rows)
+            raise
+
+    async def _save_to_store(self):
         await self.bot.wait_until_ready()
         with contextlib.suppress(asyncio.CancelledError):
             while True:
-                users_data = self._cache.copy()
-                self._cache = {}
-                group = self.config._get_base_group(self.config.MEMBER)  # Bulk update to config
-                async with group.all() as new_data:
-                    for guild_id, member_data in users_data.items():
-                        if str(guild_id) not in new_data:
-                            new_data[str(guild_id)] = {}
-                        for member_id, seen in member_data.items():
-                            new_data[str(guild_id)][str(member_id)] = {"seen": seen}
-
-                await asyncio.sleep(60)
+                try:
+                    await self._flush()
+                except Exception as exc:
+                    log.error("Exception writing last seen timestamps: ", exc_info=exc)
+                # every minute, or as soon as the recorder is full
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.recorder.full.wait(), timeout=_FLUSH_INTERVAL)
@@ -0,0 +1,82 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS seen (
+    guild_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    seen INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, member_id)
+) WITHOUT ROWID;
+"""
+# a pair only ever moves forward, so writes from the migration and the listeners
+# can land in any order
+UPSERT_SEEN = """
+INSERT INTO seen (guild_id, member_id, seen) VALUES (?, ?, ?)
+ON CONFLICT (guild_id, member_id) DO UPDATE SET seen = MAX(seen, excluded.seen);
+"""
+SELECT_SEEN = "SELECT seen FROM seen WHERE guild_id = ? AND member_id = ?;"
+DELETE_MEMBER = "DELETE FROM seen WHERE member_id = ?;"
+
+
+class SeenStore:
+    """
+    Last seen timestamps of every (guild, member) pair, in a SQLite database.
+
+    Each flush only writes the pairs that changed since the last one, and `get` is a
+    primary key lookup. Every call runs on the store's own thread, so the connection
+    never blocks the event loop and is only ever used from one thread.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="seen-store")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _open(self):
+        self._conn = sqlite3.connect(str(self._path))
+        self._conn.execute("PRAGMA journal_mode = wal;")
+        self._conn.execute("PRAGMA synchronous = normal;")
+        self._conn.execute(CREATE_TABLE)
+        self._conn.commit()
+
+    def _write(self, rows: Iterable[Tuple[int, int, int]]):
+        with self._conn:
+            self._conn.executemany(UPSERT_SEEN, rows)
+
+    def _get(self, guild_id: int, member_id: int) -> Optional[int]:
+        row = self._conn.execute(SELECT_SEEN, (guild_id, member_id)).fetchone()
+        return row[0] if row else None
+
+    def _delete_member(self, member_id: int):
+        with self._conn:
+            self._conn.execute(DELETE_MEMBER, (member_id,))
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def open(self):
+        await self._run(self._open)
+
+    async def write(self, rows: Iterable[Tuple[int, int, int]]):
+        """Write (guild_id, member_id, seen) rows, keeping the latest timestamp of each pair."""
+        await self._run(self._write, list(rows))
+
+    async def get(self, guild_id: int, member_id: int) -> Optional[int]:
+        return await self._run(self._get, guild_id, member_id)
+
+    async def delete_member(self, member_id: int):
+        """Forget a member in every guild."""
+        await self._run(self._delete_member, member_id)
+
+    async def close(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)